@@ -11,14 +11,535 @@ import sys
 import re
 import logging
 import unicodedata
+import string
+import hashlib
+import threading
+import time
+import shutil
+import sqlite3
+import heapq
+import itertools
+import mmap
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, Any, List, Optional
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Iterator, Iterable, Callable, Tuple
+
+# 파일명 슬러그화 패턴 (미리 컴파일)
+SLUG_WHITESPACE_RE = re.compile(r'\s+')
+SLUG_UNSAFE_RE = re.compile(r'[^\w\-가-힣ㄱ-ㅎㅏ-ㅣ]')
+SLUG_HYPHENS_RE = re.compile(r'-+')
+
+# 첨부파일 참조 패턴 (패턴, 경로 그룹 번호)
+ATTACHMENT_PATTERNS = [
+    (re.compile(r'!\[([^\]]*)\]\(([^)]+)\)'), 2),         # Markdown 이미지: ![alt](path)
+    (re.compile(r'!\[\[([^\]]+)\]\]'), 1),                # Obsidian 임베드: ![[filename]]
+    (re.compile(r'<img[^>]+src=["\']([^"\']+)["\']'), 1)  # HTML 이미지: <img src="path">
+]
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp')
+
+# triage 패턴 (미완료 작업, 인라인 태그, 우선순위 이모지)
+TRIAGE_TASK_RE = re.compile(r'^\s*[-*] \[ \] (.+)$', re.MULTILINE)
+TRIAGE_TAG_RE = re.compile(r'(?<![\w#&/])#([^\s#\[\]()|,.!?]+)')
+TRIAGE_PRIORITIES = (('🔴', 'high'), ('🟡', 'medium'), ('🟢', 'low'))
+
+# 날짜 인덱스 대상 필드
+DATE_INDEX_FIELDS = ('created', 'updated', 'mtime')
+
+# 노트 인덱스 레코드 형식 버전 (필드가 바뀌면 올려서 재파싱)
+# 4: 날짜 인덱스를 ordered 테이블로 이동
+NOTE_INDEX_VERSION = 4
+
+# 검증 로직 버전 (_validate_content 동작이 바뀌면 올려서 캐시된 검증 결과 무효화)
+VALIDATION_VERSION = 1
+
+# 명령 지연시간 히스토그램 버킷 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# export 형식 (msgpack, parquet은 선택 설치 패키지 필요)
+EXPORT_FORMATS = ('msgpack', 'parquet', 'graphml')
+
+# --all-vaults로 모든 vault에 병렬 실행할 수 있는 명령
+FEDERATED_COMMANDS = ['list_mocs', 'list_concepts', 'search', 'validate_many']
+
+# StateStore 삭제 표시
+_DELETED = object()
+
+# CLI 명령 목록
+COMMANDS = ['scenario_info', 'filename', 'filenames', 'specs', 'validate', 'validate_many', 'list_mocs',
+            'list_concepts', 'search', 'dates', 'archive_candidates', 'preview', 'preview_batch', 'attachments',
+            'load_specs', 'workflow', 'process_attachments', 'process_attachments_batch', 'metrics', 'export',
+            'triage']
+
+
+class StateStore:
+    """
+    cache_dir/state.db (SQLite WAL) 기반 영속 상태 저장소
+    - 여러 orchestrator.py 프로세스가 같은 캐시를 공유: 읽기는 동시에, 쓰기는 한 번에 한 프로세스
+    - put/delete는 프로세스 안에 모아 두었다가 flush() 때 한 트랜잭션으로 반영
+    - enabled=False면 메모리에만 보관
+    """
+
+    def __init__(self, cache_dir: Path, logger: logging.Logger, enabled: bool = True,
+                 busy_timeout: float = 10.0):
+        self.cache_dir = cache_dir
+        self.logger = logger
+        self.enabled = enabled
+        self.busy_timeout = busy_timeout
+        self._conn: Optional[sqlite3.Connection] = None
+        # 아직 반영하지 않은 변경 ((namespace, key) → 값 또는 _DELETED)
+        self._pending: Dict[Tuple[str, str], Any] = {}
+        # 정렬 인덱스(ordered 테이블)의 아직 반영하지 않은 변경
+        self._pending_ordered: Dict[Tuple[str, str], Any] = {}
+        # I/O 스레드 풀에서 동시에 접근하므로 잠금으로 보호
+        self._lock = threading.RLock()
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """DB 연결을 처음 필요할 때 한 번만 생성"""
+        if self._conn is None and self.enabled:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(
+                    str(self.cache_dir / 'state.db'),
+                    timeout=self.busy_timeout,
+                    isolation_level=None,
+                    check_same_thread=False
+                )
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('PRAGMA synchronous=NORMAL')
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS state ('
+                    'namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, '
+                    'PRIMARY KEY (namespace, key))'
+                )
+                # 범위 질의용 정렬 인덱스 (날짜 인덱스 등) - value 순서로 이분 탐색
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS ordered ('
+                    'namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, '
+                    'PRIMARY KEY (namespace, key))'
+                )
+                conn.execute('CREATE INDEX IF NOT EXISTS ordered_value ON ordered (namespace, value, key)')
+                self._conn = conn
+            except (OSError, sqlite3.Error) as e:
+                # 캐시를 열 수 없으면 메모리 모드로 계속 진행
+                self.logger.warning(f"Cannot open state store in {self.cache_dir}: {e}")
+                self.enabled = False
+        return self._conn
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        with self._lock:
+            if (namespace, key) in self._pending:
+                value = self._pending[(namespace, key)]
+                return default if value is _DELETED else value
+            conn = self._connection()
+            if conn is None:
+                return default
+            row = conn.execute('SELECT value FROM state WHERE namespace = ? AND key = ?',
+                               (namespace, key)).fetchone()
+            return json.loads(row[0]) if row else default
+
+    def put(self, namespace: str, key: str, value: Any):
+        with self._lock:
+            self._pending[(namespace, key)] = value
+
+    def keys(self, namespace: str) -> List[str]:
+        return [key for key, _ in self.items(namespace)]
+
+    def items(self, namespace: str) -> List[Tuple[str, Any]]:
+        with self._lock:
+            merged = {}
+            conn = self._connection()
+            if conn is not None:
+                for key, value in conn.execute('SELECT key, value FROM state WHERE namespace = ?', (namespace,)):
+                    merged[key] = json.loads(value)
+            for (pending_namespace, key), value in self._pending.items():
+                if pending_namespace != namespace:
+                    continue
+                if value is _DELETED:
+                    merged.pop(key, None)
+                else:
+                    merged[key] = value
+            return list(merged.items())
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            self._pending[(namespace, key)] = _DELETED
+
+    def put_ordered(self, namespace: str, key: str, value: str):
+        """정렬 인덱스 항목 설정 - range()로 value 범위 질의"""
+        with self._lock:
+            self._pending_ordered[(namespace, key)] = value
+
+    def delete_ordered(self, namespace: str, key: str):
+        with self._lock:
+            self._pending_ordered[(namespace, key)] = _DELETED
+
+    def range(self, namespace: str, low: Optional[str] = None, high: Optional[str] = None) -> List[str]:
+        """value가 [low, high) 범위인 key를 (value, key) 순으로 반환 - 범위 밖 항목은 읽지 않음"""
+        with self._lock:
+            rows = {}
+            conn = self._connection()
+            if conn is not None:
+                sql = 'SELECT key, value FROM ordered WHERE namespace = ?'
+                args = [namespace]
+                if low is not None:
+                    sql += ' AND value >= ?'
+                    args.append(low)
+                if high is not None:
+                    sql += ' AND value < ?'
+                    args.append(high)
+                rows = dict(conn.execute(sql, args))
+            for (pending_namespace, key), value in self._pending_ordered.items():
+                if pending_namespace != namespace:
+                    continue
+                if value is _DELETED or (low is not None and value < low) or (high is not None and value >= high):
+                    rows.pop(key, None)
+                else:
+                    rows[key] = value
+            return [key for key, _ in sorted(rows.items(), key=lambda item: (item[1], item[0]))]
+
+    def update(self, namespace: str, keys: List[str],
+               func: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        keys의 현재 값을 읽고 func가 돌려준 새 값을 쓰기까지 한 BEGIN IMMEDIATE 트랜잭션에서 실행
+        (여러 프로세스의 read-modify-write가 서로의 변경을 덮어쓰지 않음)
+        func: {key: 현재 값 또는 None} → {key: 새 값}
+        """
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                updated = func({key: self.get(namespace, key) for key in keys})
+                for key, value in updated.items():
+                    self._pending[(namespace, key)] = value
+                return updated
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                current = {}
+                for key in keys:
+                    row = conn.execute('SELECT value FROM state WHERE namespace = ? AND key = ?',
+                                       (namespace, key)).fetchone()
+                    current[key] = json.loads(row[0]) if row else None
+                updated = func(current)
+                conn.executemany('INSERT OR REPLACE INTO state (namespace, key, value) VALUES (?, ?, ?)',
+                                 [(namespace, key, json.dumps(value, ensure_ascii=False))
+                                  for key, value in updated.items()])
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+            # 같은 key의 반영 전 변경이 새 값을 덮어쓰지 않도록 제거
+            for key in updated:
+                self._pending.pop((namespace, key), None)
+            return updated
+
+    def reserve(self, namespace: str, key: str, ttl: float) -> bool:
+        """
+        key를 ttl초 동안 선점 (프로세스 간 원자적)
+        이미 다른 호출이 선점했고 만료되지 않았으면 False
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                current = self._pending.get((namespace, key))
+                if current not in (None, _DELETED) and current['expires'] > now:
+                    return False
+                self._pending[(namespace, key)] = {'expires': now + ttl}
+                return True
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    row = conn.execute('SELECT value FROM state WHERE namespace = ? AND key = ?',
+                                       (namespace, key)).fetchone()
+                    if row and json.loads(row[0])['expires'] > now:
+                        conn.execute('ROLLBACK')
+                        return False
+                    conn.execute('INSERT OR REPLACE INTO state (namespace, key, value) VALUES (?, ?, ?)',
+                                 (namespace, key, json.dumps({'expires': now + ttl})))
+                    # 만료된 선점은 함께 정리
+                    conn.execute("DELETE FROM state WHERE namespace = ? AND json_extract(value, '$.expires') < ?",
+                                 (namespace, now))
+                    conn.execute('COMMIT')
+                    return True
+                except Exception:
+                    conn.execute('ROLLBACK')
+                    raise
+            except sqlite3.Error as e:
+                # 선점 여부를 확인할 수 없으면 보호가 없는 것이므로 실패로 처리
+                self.logger.warning(f"Cannot reserve {namespace}/{key}: {e}")
+                return False
+
+    def flush(self):
+        """모아 둔 변경을 한 쓰기 트랜잭션으로 반영"""
+        with self._lock:
+            if not self._pending and not self._pending_ordered:
+                return
+            conn = self._connection()
+            if conn is None:
+                return
+            upserts = [(namespace, key, json.dumps(value, ensure_ascii=False))
+                       for (namespace, key), value in self._pending.items() if value is not _DELETED]
+            deletes = [(namespace, key) for (namespace, key), value in self._pending.items() if value is _DELETED]
+            ordered_upserts = [(namespace, key, value) for (namespace, key), value in self._pending_ordered.items()
+                               if value is not _DELETED]
+            ordered_deletes = [(namespace, key) for (namespace, key), value in self._pending_ordered.items()
+                               if value is _DELETED]
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    conn.executemany('INSERT OR REPLACE INTO state (namespace, key, value) VALUES (?, ?, ?)', upserts)
+                    conn.executemany('DELETE FROM state WHERE namespace = ? AND key = ?', deletes)
+                    conn.executemany('INSERT OR REPLACE INTO ordered (namespace, key, value) VALUES (?, ?, ?)',
+                                     ordered_upserts)
+                    conn.executemany('DELETE FROM ordered WHERE namespace = ? AND key = ?', ordered_deletes)
+                    conn.execute('COMMIT')
+                except Exception:
+                    conn.execute('ROLLBACK')
+                    raise
+                self._pending.clear()
+                self._pending_ordered.clear()
+            except sqlite3.Error as e:
+                # 다른 프로세스가 오래 쓰기 잠금을 잡고 있는 경우 - 다음 flush에서 재시도
+                self.logger.warning(f"Failed to persist cache in {self.cache_dir}: {e}")
+
+
+class WriteJournal:
+    """
+    변경 명령용 write-ahead journal
+    - 파일 이동/내용 교체를 그룹 단위로 journal에 먼저 기록(fsync 1회)한 뒤 실행
+    - 실행 중 실패하면 이미 실행한 작업을 되돌림 (roll back)
+    - 실행 중 프로세스가 죽으면 다음 실행 때 recover()가 남은 작업을 마저 실행 (roll forward)
+      단, 그 사이 수정된 노트가 있으면 덮어쓰지 않고 journal을 남겨 둠
+    - 교체한 파일은 임시 파일을 fsync한 뒤 rename, 그룹이 끝나면 건드린 디렉토리를 한 번씩 fsync한 뒤 journal 삭제
+      (macOS에서는 F_FULLFSYNC - fsync만으로는 디스크 캐시까지 내려가지 않음)
+    """
+
+    def __init__(self, journal_dir: Path, logger: logging.Logger, legacy_dirs: Optional[List[Path]] = None):
+        self.journal_dir = journal_dir
+        self.logger = logger
+        # recover()만 확인하는 이전 journal 위치
+        self.legacy_dirs = legacy_dirs or []
+
+    def apply(self, ops: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        작업 그룹을 원자적으로 실행
+        ops: {'op': 'mkdir', 'path'} | {'op': 'move', 'src', 'dst'} | {'op': 'write', 'path', 'content', 'before'}
+        """
+        if not ops:
+            return {'applied': [], 'failed': [], 'rolled_back': False}
+        
+        journal_path = self._write_journal(ops)
+        applied = []
+        try:
+            for op in ops:
+                self._execute(op)
+                applied.append(op)
+        except Exception as e:
+            self.logger.error(f"Journal group failed at {self._describe(op)}: {e} - rolling back")
+            rolled_back = self._rollback(applied)
+            if rolled_back:
+                self._sync(applied)
+                self._remove(journal_path)
+            return {
+                'applied': [],
+                'failed': [{'op': self._describe(op), 'error': str(e)}],
+                'rolled_back': rolled_back
+            }
+        
+        self._sync(applied)
+        self._remove(journal_path)
+        return {'applied': [self._describe(op) for op in applied], 'failed': [], 'rolled_back': False}
+
+    def recover(self) -> int:
+        """남아 있는 journal을 처리 - 완전히 기록된 그룹은 roll forward, 기록 중 끊긴 그룹은 폐기"""
+        journal_paths = sorted(path for directory in [self.journal_dir] + self.legacy_dirs
+                               if directory.exists() for path in directory.glob('*.journal'))
+        
+        recovered = 0
+        for journal_path in journal_paths:
+            try:
+                ops = json.loads(journal_path.read_text(encoding='utf-8'))['ops']
+            except (OSError, ValueError, KeyError):
+                # journal 기록 전에 끊긴 그룹 - 아무 작업도 실행되지 않았으므로 버림
+                self.logger.warning(f"Discarding incomplete journal: {journal_path}")
+                self._remove(journal_path)
+                continue
+            
+            # journal 기록 이후 사용자가 수정한 노트가 있으면 덮어쓰지 않고 journal을 남겨 둠
+            conflicts = [op['path'] for op in ops if op['op'] == 'write' and self._write_conflict(op)]
+            if conflicts:
+                self.logger.error(f"Not rolling forward {journal_path}: changed since journal was written: "
+                                  f"{', '.join(conflicts)}")
+                continue
+            
+            try:
+                for op in ops:
+                    self._execute(op)
+            except Exception as e:
+                self.logger.error(f"Cannot roll forward {journal_path}: {e}")
+                continue
+            
+            self._sync(ops)
+            self._remove(journal_path)
+            recovered += 1
+            self.logger.info(f"Rolled forward journal {journal_path.name} ({len(ops)} operations)")
+        
+        return recovered
+
+    def _write_journal(self, ops: List[Dict[str, Any]]) -> Path:
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        name = f"{datetime.now().strftime('%Y%m%dT%H%M%S%f')}-{os.getpid()}.journal"
+        journal_path = self.journal_dir / name
+        tmp_path = journal_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'ops': ops}, f, ensure_ascii=False)
+            f.flush()
+            self._fsync(f.fileno())
+        # rename으로 journal이 완전히 기록된 시점을 확정
+        os.replace(tmp_path, journal_path)
+        self._fsync_dir(self.journal_dir)
+        return journal_path
+
+    def _execute(self, op: Dict[str, Any]):
+        """작업 실행 - recover()에서 다시 실행해도 안전하도록 멱등적으로 처리"""
+        if op['op'] == 'mkdir':
+            Path(op['path']).mkdir(parents=True, exist_ok=True)
+        elif op['op'] == 'move':
+            src, dst = Path(op['src']), Path(op['dst'])
+            if not src.exists() and dst.exists():
+                return  # 이미 이동됨
+            if dst.exists():
+                raise FileExistsError(f"Target already exists: {dst}")
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(src), str(dst))
+        elif op['op'] == 'write':
+            path = Path(op['path'])
+            if path.exists() and path.read_text(encoding='utf-8') == op['content']:
+                return  # 이미 반영됨
+            if self._write_conflict(op):
+                raise RuntimeError(f"File changed since journal was written: {path}")
+            self._replace_content(path, op['content'])
+        else:
+            raise ValueError(f"Unknown journal operation: {op['op']}")
+
+    def _write_conflict(self, op: Dict[str, Any]) -> bool:
+        """write 대상의 현재 내용이 기록 당시(before)도, 반영 후(content)도 아닌지"""
+        path = Path(op['path'])
+        current = path.read_text(encoding='utf-8') if path.exists() else None
+        return current not in (op.get('before'), op['content'])
+
+    def _rollback(self, applied: List[Dict[str, Any]]) -> bool:
+        """실행한 작업을 역순으로 되돌림"""
+        try:
+            for op in reversed(applied):
+                if op['op'] == 'move':
+                    shutil.move(op['dst'], op['src'])
+                elif op['op'] == 'write' and op.get('before') is not None:
+                    self._replace_content(Path(op['path']), op['before'])
+            return True
+        except Exception as e:
+            # journal을 남겨 두면 다음 실행에서 roll forward
+            self.logger.error(f"Rollback failed, journal kept for recovery: {e}")
+            return False
+
+    def _replace_content(self, path: Path, content: str):
+        """
+        임시 파일 fsync + rename으로 내용 교체 (디렉토리 fsync는 그룹 끝에서 한 번)
+        - 임시 파일에 원본의 권한/소유자/확장 속성을 내용을 쓰기 전에 복사
+        - 하드 링크가 걸린 노트는 rename하면 링크가 끊기므로 제자리에서 덮어씀
+        """
+        try:
+            original = path.stat()
+        except FileNotFoundError:
+            original = None
+        
+        if original is not None and original.st_nlink > 1:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(content)
+                f.flush()
+                self._fsync(f.fileno())
+            return
+        
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            if original is not None:
+                self._copy_metadata(path, original, tmp_path)
+            f.write(content)
+            f.flush()
+            self._fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _copy_metadata(self, path: Path, original: os.stat_result, target: Path):
+        """권한 비트, 소유자, 확장 속성 복사 (수정 시각은 새 내용 기준으로 둠 - 노트 인덱스가 mtime으로 변경 감지)"""
+        os.chmod(target, original.st_mode & 0o7777)
+        try:
+            os.chown(target, original.st_uid, original.st_gid)
+        except (AttributeError, OSError):
+            pass  # 다른 사용자 소유 파일은 소유자를 바꿀 수 없음
+        if hasattr(os, 'listxattr'):
+            try:
+                names = os.listxattr(path)
+            except OSError:
+                names = []
+            for name in names:
+                try:
+                    os.setxattr(target, name, os.getxattr(path, name))
+                except OSError:
+                    pass
+
+    def _describe(self, op: Dict[str, Any]) -> str:
+        if op['op'] == 'move':
+            return f"move {op['src']} -> {op['dst']}"
+        return f"{op['op']} {op['path']}"
+
+    def _sync(self, ops: List[Dict[str, Any]]):
+        """그룹이 건드린 디렉토리(생성한 폴더, 이동 원본/대상 폴더, 교체한 파일의 폴더)를 한 번씩 fsync"""
+        directories = set()
+        for op in ops:
+            if op['op'] == 'mkdir':
+                directories.update((Path(op['path']), Path(op['path']).parent))
+            elif op['op'] == 'move':
+                directories.update((Path(op['src']).parent, Path(op['dst']).parent))
+            elif op['op'] == 'write':
+                directories.add(Path(op['path']).parent)
+        for directory in sorted(directories):
+            self._fsync_dir(directory)
+
+    def _fsync(self, fd: int):
+        """fsync - macOS는 디스크 쓰기 캐시까지 비우는 F_FULLFSYNC 사용"""
+        if sys.platform == 'darwin':
+            import fcntl
+            try:
+                fcntl.fcntl(fd, fcntl.F_FULLFSYNC)
+                return
+            except OSError:
+                pass  # 지원하지 않는 파일시스템
+        os.fsync(fd)
+
+    def _fsync_dir(self, directory: Path):
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            self._fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def _remove(self, journal_path: Path):
+        try:
+            journal_path.unlink()
+        except OSError:
+            pass
+
 
 class ZettelkastenHelper:
     """경량 도우미 클래스 - 시나리오 매칭 제거"""
     
-    def __init__(self, config_path: str):
+    def __init__(self, config_path: str, vault: Optional[str] = None):
         # 로깅 설정
         self._setup_logging()
         
@@ -26,15 +547,23 @@ class ZettelkastenHelper:
         try:
             with open(config_path, 'r', encoding='utf-8') as f:
                 self.config = yaml.safe_load(f)
+            self.config_path = config_path
             self.logger.info(f"Configuration loaded from {config_path}")
         except Exception as e:
             if hasattr(self, 'logger'):
                 self.logger.error(f"Failed to load config: {e}")
             raise
         
-        # 환경 변수 우선, 없으면 config, 최종적으로 현재 디렉토리
+        # vault 지정 시 vaults 설정 우선, 없으면 환경 변수, config, 최종적으로 현재 디렉토리
+        self.vault = vault
         docs_root = os.environ.get('DOCS_HOME')
-        if docs_root:
+        if vault:
+            vaults = self.config.get('vaults') or {}
+            if vault not in vaults:
+                raise ValueError(f"Unknown vault: {vault} (configured: {', '.join(vaults) or 'none'})")
+            self.docs_root = Path(vaults[vault]).expanduser()
+            self.logger.info(f"Using vault '{vault}': {self.docs_root}")
+        elif docs_root:
             self.docs_root = Path(docs_root)
             self.logger.info(f"Using DOCS_HOME from environment: {self.docs_root}")
         elif 'docs_root' in self.config:
@@ -48,7 +577,39 @@ class ZettelkastenHelper:
         # 경로 검증
         if not self.docs_root.exists():
             self.logger.warning(f"docs_root does not exist: {self.docs_root}")
-    
+
+        # 영속 캐시 (검증 결과 등) - docs_root가 없으면 비활성화
+        # 기본 위치는 vault 밖 로컬 폴더 (iCloud 등 동기화 폴더에서는 SQLite WAL이 동작하지 않음)
+        cache_config = self.config.get('cache', {})
+        configured_dir = cache_config.get('dir')
+        self.cache_dir = self.docs_root / configured_dir if configured_dir else self._default_cache_dir()
+        self.state = StateStore(
+            self.cache_dir,
+            self.logger,
+            enabled=cache_config.get('enabled', True) and self.docs_root.exists(),
+            busy_timeout=cache_config.get('busy_timeout', 10)
+        )
+        
+        # 파일 I/O 동시성 (iCloud 등 네트워크 볼륨에서 read가 블로킹되는 경우 대비)
+        io_workers = os.environ.get('IO_WORKERS') or self.config.get('io', {}).get('max_workers', 8)
+        self.io_workers = max(1, int(io_workers))
+        
+        # 파일 이동/수정 명령용 write-ahead journal (이전 기본 위치에 남은 journal도 복구)
+        legacy_journal = self.docs_root / '90-설정' / '.cache' / 'journal'
+        self.journal = WriteJournal(self.cache_dir / 'journal', self.logger,
+                                    [legacy_journal] if legacy_journal != self.cache_dir / 'journal' else [])
+
+    def _default_cache_dir(self) -> Path:
+        """사용자별 로컬 캐시 폴더 - docs_root 경로 해시로 vault마다 분리"""
+        if sys.platform == 'darwin':
+            base = Path.home() / 'Library' / 'Caches'
+        elif os.name == 'nt':
+            base = Path(os.environ.get('LOCALAPPDATA') or Path.home())
+        else:
+            base = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache')
+        digest = hashlib.sha256(str(self.docs_root.resolve()).encode('utf-8')).hexdigest()[:12]
+        return base / 'docs-system' / digest
+
     def _setup_logging(self):
         """로깅 시스템 설정"""
         log_level = os.environ.get('LOG_LEVEL', 'INFO')
@@ -89,14 +650,97 @@ class ZettelkastenHelper:
             'needs_suffix': scenario_config.get('needs_suffix', False)
         }
     
-    def get_filename(self, scenario: str, title: str, **kwargs) -> Dict[str, Any]:
-        """파일명 생성 - 슬러그화 및 안전한 파일명 생성"""
+    def get_filename(self, scenario: str, title: str, reserve: bool = False, **kwargs) -> Dict[str, Any]:
+        """
+        파일명 생성 - 슬러그화 및 안전한 파일명 생성
+        reserve=True면 할당한 suffix를 다른 프로세스가 받지 않도록 선점 (조회만 할 때는 선점하지 않음)
+        """
+        return self._generate_filename(scenario, title, kwargs, {}, {}, reserve)
+    
+    def get_filenames(self, items: List[Any], reserve: bool = False) -> Dict[str, Any]:
+        """
+        파일명 일괄 생성
+        - items: [scenario, title, kwargs] 또는 {'scenario', 'title', ...kwargs} 목록
+        - 시나리오별 파일명/경로 템플릿은 한 번만 컴파일
+        - suffix는 디스크의 기존 파일과 배치 안의 다른 항목 모두와 겹치지 않게 할당
+        - reserve=True면 할당한 suffix를 다른 프로세스에 대해서도 선점
+        """
+        compiled = {}
+        taken = {}
+        now = datetime.now()
+        
+        results = []
+        for item in items:
+            if isinstance(item, dict):
+                scenario = item.get('scenario')
+                title = item.get('title')
+                kwargs = {k: v for k, v in item.items() if k not in ('scenario', 'title')}
+            elif isinstance(item, (list, tuple)) and len(item) in (2, 3):
+                scenario, title = item[0], item[1]
+                kwargs = dict(item[2]) if len(item) == 3 and item[2] else {}
+            else:
+                results.append({'error': f'Invalid item (expected [scenario, title, kwargs]): {item}'})
+                continue
+            
+            if not title:
+                results.append({'error': 'Missing title', 'scenario': scenario})
+                continue
+            
+            # 배치 전체가 같은 시각 기준으로 생성
+            kwargs.setdefault('date', now)
+            results.append(self._generate_filename(scenario, str(title), kwargs, compiled, taken, reserve))
+        
+        errors = sum(1 for result in results if 'error' in result)
+        self.logger.info(f"Generated {len(results) - errors} filenames in batch ({errors} errors)")
+        
+        return {
+            'results': results,
+            'count': len(results),
+            'errors': errors
+        }
+    
+    def _compile_scenario_templates(self, scenario: str) -> Dict[str, Any]:
+        """시나리오의 filename_template / path 템플릿을 조각 목록으로 미리 분해"""
+        rule = self.config['scenarios'][scenario]
+        template = rule.get('filename_template')
+        path_template = rule.get('path', '')
+        return {
+            'rule': rule,
+            'template': template,
+            'render': self._compile_template(template) if template else None,
+            'path_template': path_template,
+            'render_path': self._compile_template(path_template)
+        }
+    
+    def _compile_template(self, template: str) -> Callable[[Dict[str, Any]], str]:
+        """str.format 템플릿을 (리터럴, 필드) 조각으로 한 번만 파싱해 렌더 함수 반환"""
+        parts = list(string.Formatter().parse(template))
+        if any(spec or conversion for _, _, spec, conversion in parts):
+            # 포맷 지정자가 있으면 str.format에 그대로 위임
+            return lambda params: template.format(**params)
+        
+        def render(params: Dict[str, Any]) -> str:
+            # 누락된 필드는 str.format과 같이 KeyError
+            return ''.join(literal + (str(params[field]) if field is not None else '')
+                           for literal, field, _, _ in parts)
+        return render
+    
+    def _generate_filename(self, scenario: str, title: str, kwargs: Dict[str, Any],
+                           compiled: Dict[str, Dict[str, Any]], taken: Dict[Path, set],
+                           reserve: bool = False) -> Dict[str, Any]:
+        """
+        파일명 생성 본체 - get_filename / get_filenames 공용
+        compiled: 시나리오별 컴파일된 템플릿, taken: 디렉토리별 사용 중인 파일명, reserve: suffix 선점 여부
+        """
         if scenario not in self.config['scenarios']:
             self.logger.error(f"Unknown scenario: {scenario}")
             return {'error': f'Unknown scenario: {scenario}'}
         
-        rule = self.config['scenarios'][scenario]
-        template = rule.get('filename_template')
+        if scenario not in compiled:
+            compiled[scenario] = self._compile_scenario_templates(scenario)
+        templates = compiled[scenario]
+        rule = templates['rule']
+        template = templates['template']
         
         if not template:
             self.logger.error(f"No filename template for scenario: {scenario}")
@@ -126,9 +770,8 @@ class ZettelkastenHelper:
             params['project_name'] = project_name
             
             # 프로젝트 메인 파일명
-            filename = template.format(**params)
-            path_template = rule['path']
-            path = path_template.format(project_name=project_name)
+            filename = templates['render'](params)
+            path = templates['render_path']({'project_name': project_name})
             full_path = self.docs_root / path / filename
             
             # 프로젝트 구조 파일들 정의
@@ -155,29 +798,32 @@ class ZettelkastenHelper:
         if 'project_name' in kwargs:
             params['project_name'] = self._slugify(kwargs['project_name'])
         
+        # 경로 생성
+        path_template = templates['path_template']
+        if '{project_name}' in path_template:
+            path = templates['render_path']({'project_name': params.get('project_name', 'untitled')})
+        else:
+            path = path_template
+        directory = self.docs_root / path
+        
         # suffix 처리
         if rule.get('needs_suffix'):
-            params['suffix'] = self._find_next_suffix(scenario, params['date'], safe_title, template)
+            params['suffix'] = self._find_next_suffix(directory, params, templates['render'], taken, reserve)
+            if params['suffix'] is None:
+                return {'error': f"No available suffix for {safe_title} on {params['date']} (all taken or reserved)"}
         
         # 파일명 생성
         try:
-            filename = template.format(**params)
+            filename = templates['render'](params)
         except KeyError as e:
             self.logger.error(f"Missing template parameter: {e}")
             return {'error': f'Missing template parameter: {e}'}
         
-        # 경로 생성
-        path_template = rule['path']
-        if '{project_name}' in path_template:
-            path = path_template.format(project_name=params.get('project_name', 'untitled'))
-        else:
-            path = path_template
-        
-        full_path = self.docs_root / path / filename
+        full_path = directory / filename
         
         self.logger.info(f"Generated filename: {filename} at {path}")
         
-        return {
+        result = {
             'filename': filename,
             'template': template,
             'path': path,
@@ -185,17 +831,39 @@ class ZettelkastenHelper:
             'needs_suffix': rule.get('needs_suffix', False),
             'safe_title': safe_title
         }
+        
+        # suffix가 없는 시나리오는 충돌 여부만 알림
+        names = self._taken_names(directory, taken)
+        key = self._filename_key(filename)
+        if not rule.get('needs_suffix') and key in names:
+            result['conflict'] = True
+        names.add(key)
+        
+        return result
+    
+    def _filename_key(self, filename: str) -> str:
+        """macOS(APFS)처럼 대소문자/정규화 구분 없는 파일시스템 기준 비교 키"""
+        return unicodedata.normalize('NFC', filename).casefold()
+    
+    def _taken_names(self, directory: Path, taken: Dict[Path, set]) -> set:
+        """디렉토리의 기존 파일명 집합 (디렉토리당 listdir 한 번)"""
+        if directory not in taken:
+            try:
+                taken[directory] = {self._filename_key(name) for name in os.listdir(directory)}
+            except OSError:
+                taken[directory] = set()
+        return taken[directory]
     
     def _slugify(self, text: str) -> str:
         """텍스트를 파일명으로 안전하게 변환"""
         # Unicode 정규화
         text = unicodedata.normalize('NFKC', text)
         # 공백을 하이픈으로
-        text = re.sub(r'\s+', '-', text)
+        text = SLUG_WHITESPACE_RE.sub('-', text)
         # 파일명에 안전하지 않은 문자 제거
-        text = re.sub(r'[^\w\-가-힣ㄱ-ㅎㅏ-ㅣ]', '', text)
+        text = SLUG_UNSAFE_RE.sub('', text)
         # 연속된 하이픈 제거
-        text = re.sub(r'-+', '-', text)
+        text = SLUG_HYPHENS_RE.sub('-', text)
         # 앞뒤 하이픈 제거
         text = text.strip('-')
         return text or 'untitled'
@@ -213,35 +881,43 @@ class ZettelkastenHelper:
         else:
             return str(obj)
     
-    def _find_next_suffix(self, scenario: str, date: str, title: str, template: str) -> str:
-        """suffix 자동 증가 - 템플릿 기반"""
-        rule = self.config['scenarios'][scenario]
-        path = self.docs_root / rule['path']
-        
-        if not path.exists():
-            self.logger.debug(f"Path does not exist, using suffix 'a': {path}")
-            return 'a'
-        
+    def _find_next_suffix(self, directory: Path, params: Dict[str, Any],
+                          render: Callable[[Dict[str, Any]], str], taken: Dict[Path, set],
+                          reserve: bool = False) -> Optional[str]:
+        """
+        suffix 자동 증가 - 템플릿 기반, 배치 안에서 할당한 이름도 피함
+        reserve=True면 다른 프로세스가 선점한 이름을 피하고 고른 이름을 선점
+        남은 suffix가 없으면 None
+        """
+        names = self._taken_names(directory, taken)
         suffix_chars = self.config.get('suffix', {}).get('chars', 'abcdefghij')
+        ttl = self.config.get('suffix', {}).get('reservation_ttl', 600)
         
-        # 템플릿에서 suffix 위치 찾기
-        for suffix in suffix_chars:
+        # 템플릿에서 suffix 위치 찾기 ('z'는 마지막 후보로 같은 방식으로 확인)
+        candidates = suffix_chars if 'z' in suffix_chars else suffix_chars + 'z'
+        for suffix in candidates:
             # 템플릿 기반으로 테스트 파일명 생성
-            test_params = {'date': date, 'title': title, 'suffix': suffix}
+            test_params = {'date': params['date'], 'title': params['title'], 'suffix': suffix}
             try:
-                test_name = template.format(**test_params)
+                test_name = render(test_params)
             except KeyError:
                 # 템플릿 파싱 실패 시 기본 패턴 사용
-                test_name = f"개념-{date}{suffix}-{title}.md"
+                test_name = f"개념-{params['date']}{suffix}-{params['title']}.md"
                 self.logger.warning(f"Template parsing failed, using default pattern: {test_name}")
             
-            if not (path / test_name).exists():
-                self.logger.debug(f"Found available suffix: {suffix}")
-                return suffix
+            key = self._filename_key(test_name)
+            if key in names:
+                continue
+            # 동시에 실행된 다른 프로세스가 같은 이름을 받지 않도록 선점
+            if reserve and not self.state.reserve('suffix_reservations', str(directory / key), ttl):
+                self.logger.debug(f"Suffix '{suffix}' reserved by another process")
+                continue
+            self.logger.debug(f"Found available suffix: {suffix}")
+            return suffix
         
-        # 모든 suffix가 사용된 경우
-        self.logger.warning(f"All suffixes used for {date}-{title}, using 'z'")
-        return 'z'
+        # 모든 suffix가 사용(또는 선점)된 경우 - 겹치는 이름을 돌려주지 않음
+        self.logger.warning(f"All suffixes used for {params['date']}-{params['title']}")
+        return None
     
     def get_specs(self, scenario: str) -> Dict[str, Any]:
         """필요한 spec 파일 목록 반환"""
@@ -256,18 +932,166 @@ class ZettelkastenHelper:
             'full_paths': full_paths
         }
     
-    def validate(self, filepath: str, mode: str = 'deep') -> Dict[str, Any]:
+    def validate(self, filepath: str, mode: str = 'deep', use_cache: bool = True) -> Dict[str, Any]:
         """
         파일 검증 - 기본이 deep validation
         
         mode='deep' (기본): 구조 검증 + validator specs 반환
         mode='quick': 구조 검증만
+        
+        결과는 내용 해시 + 규칙/validator spec 지문을 키로 캐시된다.
         """
-        path = Path(filepath)
+        result = self._validate_path(Path(filepath), mode, use_cache)
+        self.state.flush()
+        return result
+    
+    def validate_many(self, filepaths: List[str], mode: str = 'deep', use_cache: bool = True) -> Dict[str, Any]:
+        """
+        여러 파일 검증 - 파일 읽기를 I/O 스레드 풀로 동시에 수행
+        폴더는 _walk_notes로 펼침 (숨김 폴더, 90-설정 제외)
+        결과는 입력 순서대로 반환하고 캐시는 마지막에 한 번만 저장
+        """
+        paths = []
+        for filepath in filepaths:
+            path = Path(filepath)
+            if path.is_dir():
+                # 숨김 폴더(.trash 등)와 90-설정(spec, 템플릿)은 제외
+                paths.extend(sorted(Path(entry.path) for entry in self._walk_notes(path)))
+            else:
+                paths.append(path)
         
+        results = []
+        summary = {'success': 0, 'warning': 0, 'error': 0}
+        for path, result in zip(paths, self.map_io(lambda p: self._validate_path(p, mode, use_cache), paths)):
+            summary[result['status']] = summary.get(result['status'], 0) + 1
+            results.append(dict({'path': str(path)}, **result))
+        
+        self.state.flush()
+        
+        return {
+            'results': results,
+            'count': len(results),
+            'summary': summary
+        }
+    
+    def _validate_path(self, path: Path, mode: str, use_cache: bool) -> Dict[str, Any]:
+        """단일 파일 검증 (캐시 조회/갱신 포함, 저장은 호출자가 담당)"""
         if not path.exists():
             return {'status': 'error', 'error': 'File not found'}
         
+        if not use_cache or not self.state.enabled:
+            try:
+                content = self._decode_text(path.read_bytes())
+            except Exception as e:
+                return {'status': 'error', 'error': f'Cannot read file: {e}'}
+            return self._validate_content(content, mode)
+        
+        try:
+            stat = path.stat()
+        except OSError as e:
+            return {'status': 'error', 'error': f'Cannot read file: {e}'}
+        
+        key = f"{path.resolve()}::{mode}"
+        deps = self._validation_fingerprint(path, mode)
+        entry = self.state.get('validation', key)
+        
+        # 규칙/spec 지문이 같고 mtime/size도 같으면 파일을 읽지 않고 반환
+        if entry and entry['deps'] == deps and \
+                entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            self.logger.debug(f"Validation cache hit (stat): {path}")
+            return dict(entry['result'], cached=True)
+        
+        try:
+            data = path.read_bytes()
+            content = self._decode_text(data)
+        except Exception as e:
+            return {'status': 'error', 'error': f'Cannot read file: {e}'}
+        
+        content_hash = hashlib.sha256(data).hexdigest()
+        cache_hit = bool(entry) and entry['deps'] == deps and entry['content_hash'] == content_hash
+        if cache_hit:
+            # touch만 된 경우 - stat 정보만 갱신
+            self.logger.debug(f"Validation cache hit (content): {path}")
+            result = entry['result']
+        else:
+            result = self._validate_content(content, mode)
+        
+        self.state.put('validation', key, {
+            'content_hash': content_hash,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'deps': deps,
+            'result': result
+        })
+        
+        return dict(result, cached=cache_hit)
+    
+    def _decode_text(self, data: bytes) -> str:
+        """read_text와 동일하게 UTF-8 디코딩 + 줄바꿈 정규화"""
+        return data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+    
+    def _hash_json(self, obj: Any) -> str:
+        """설정 조각의 안정적인 해시"""
+        payload = json.dumps(self._make_json_serializable(obj), sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+    
+    def _scenario_for_path(self, path: Path) -> Optional[str]:
+        """노트 경로가 속한 시나리오 (scenarios.*.path 기준)"""
+        try:
+            relative = path.resolve().relative_to(self.docs_root.resolve()).as_posix()
+        except (OSError, ValueError):
+            return None
+        
+        for name, rule in self.config['scenarios'].items():
+            scenario_path = rule.get('path')
+            if not scenario_path:
+                continue
+            # 40-실행/{project_name} 같은 템플릿 경로는 고정 prefix만 비교
+            prefix = scenario_path.split('{', 1)[0].rstrip('/')
+            if relative.startswith(prefix + '/'):
+                return name
+        return None
+    
+    def _validator_spec_paths(self) -> List[Path]:
+        """deep validation이 참조하는 validator spec 경로"""
+        validators_dir = self.docs_root / '90-설정' / 'specs' / 'validators'
+        return [
+            validators_dir / 'link-validator.spec.md',
+            validators_dir / 'tag-validator.spec.md'
+        ]
+    
+    def _validation_fingerprint(self, path: Path, mode: str) -> Dict[str, str]:
+        """
+        검증 결과가 의존하는 규칙 지문
+        - code: 검증 로직 버전 (VALIDATION_VERSION)
+        - rules: 전역 validation + 해당 시나리오의 validation 규칙
+        - specs: validator spec 내용 (deep 모드만)
+        """
+        scenario = self._scenario_for_path(path)
+        rules = {
+            'version': self.config.get('version'),
+            'validation': self.config.get('validation', {}),
+            'scenario': scenario,
+            'scenario_validation': self.config['scenarios'].get(scenario, {}).get('validation', []) if scenario else []
+        }
+        deps = {'code': VALIDATION_VERSION, 'rules': self._hash_json(rules)}
+        
+        if mode == 'deep':
+            if not hasattr(self, '_validator_specs_digest'):
+                digest = hashlib.sha256()
+                for spec_path in self._validator_spec_paths():
+                    digest.update(spec_path.name.encode('utf-8'))
+                    try:
+                        digest.update(spec_path.read_bytes())
+                    except OSError:
+                        digest.update(b'<missing>')
+                self._validator_specs_digest = digest.hexdigest()[:16]
+            deps['specs'] = self._validator_specs_digest
+        
+        return deps
+    
+    def _validate_content(self, content: str, mode: str) -> Dict[str, Any]:
+        """파일 내용에 대한 구조/링크 검증 (캐시 대상)"""
         # 기본 구조 검증
         checks = {
             'exists': True,
@@ -280,11 +1104,6 @@ class ZettelkastenHelper:
         warnings = []
         errors = []
         
-        try:
-            content = path.read_text(encoding='utf-8')
-        except Exception as e:
-            return {'status': 'error', 'error': f'Cannot read file: {e}'}
-        
         # Frontmatter 검증
         match = re.match(r'^---\n(.*?)\n---\n', content, re.DOTALL)
         if match:
@@ -331,10 +1150,7 @@ class ZettelkastenHelper:
         # Deep validation 모드
         if mode == 'deep' and match:
             # Validator specs 경로 추가
-            validator_specs = [
-                str(self.docs_root / '90-설정' / 'specs' / 'validators' / 'link-validator.spec.md'),
-                str(self.docs_root / '90-설정' / 'specs' / 'validators' / 'tag-validator.spec.md')
-            ]
+            validator_specs = [str(p) for p in self._validator_spec_paths()]
             
             # 링크 분석
             links_by_type = {
@@ -397,11 +1213,24 @@ class ZettelkastenHelper:
                 'warning': 'MOC directory not found'
             }
         
-        mocs = []
-        for file_path in moc_dir.glob('맵-*.md'):
+        mocs = list(self.iter_mocs())
+        
+        return {
+            'mocs': mocs,
+            'count': len(mocs)
+        }
+    
+    def iter_mocs(self) -> Iterator[Dict[str, Any]]:
+        """MOC 레코드를 파싱되는 즉시 하나씩 반환 (스트리밍)"""
+        moc_dir = self.docs_root / '30-연결'
+        if not moc_dir.exists():
+            self.logger.warning(f"MOC directory not found: {moc_dir}")
+            return
+        
+        for file_path, content, error in self.read_texts(self._iter_note_files(moc_dir, '맵-')):
+            if error:
+                continue
             try:
-                content = file_path.read_text(encoding='utf-8')
-                
                 match = re.match(r'^---\n(.*?)\n---\n', content, re.DOTALL)
                 if match:
                     frontmatter = yaml.safe_load(match.group(1))
@@ -412,21 +1241,18 @@ class ZettelkastenHelper:
                 title = file_path.stem.replace('맵-', '')
                 concept_links = re.findall(r'\[\[개념-[^\]]+\]\]', content)
                 
-                mocs.append({
+                record = {
                     'filename': file_path.name,
                     'title': title,
                     'path': str(file_path.relative_to(self.docs_root)),
                     'full_path': str(file_path),
                     'tags': tags,
                     'linked_concepts': len(concept_links)
-                })
+                }
             except Exception:
                 continue
-        
-        return {
-            'mocs': mocs,
-            'count': len(mocs)
-        }
+            
+            yield record
     
     def list_concepts(self, filters: Optional[Dict] = None) -> Dict[str, Any]:
         """개념 목록 반환"""
@@ -438,15 +1264,36 @@ class ZettelkastenHelper:
                 'warning': 'Concepts directory not found'
             }
         
+        concepts = list(self.iter_concepts(filters))
+        
+        return {
+            'concepts': concepts,
+            'count': len(concepts)
+        }
+    
+    def iter_concepts(self, filters: Optional[Dict] = None,
+                      refresh: Optional[bool] = None) -> Iterator[Dict[str, Any]]:
+        """필터를 통과한 개념 레코드를 파싱되는 즉시 하나씩 반환 (스트리밍)"""
+        concept_dir = self.docs_root / '20-정리' / '핵심개념'
+        if not concept_dir.exists():
+            self.logger.warning(f"Concepts directory not found: {concept_dir}")
+            return
+        
         filters = filters or {}
         tag_filters = filters.get('tags', [])
-        after_date = filters.get('after_date')
+        after_date, before_date = self._date_bounds(filters)
+        
+        files = self._iter_note_files(concept_dir, '개념-')
+        if after_date or before_date:
+            # 날짜 인덱스로 범위 밖 노트만 건너뜀 - 인덱스에 없거나 바뀐 노트, created 없는 노트는 읽어서 판단
+            self._ensure_note_index(refresh)
+            candidates = set(self._date_range('created', after_date, before_date))
+            files = (p for p in files if not self._indexed_outside(p, candidates))
         
-        concepts = []
-        for file_path in concept_dir.glob('개념-*.md'):
+        for file_path, content, error in self.read_texts(files):
+            if error:
+                continue
             try:
-                content = file_path.read_text(encoding='utf-8')
-                
                 # Frontmatter 파싱
                 match = re.match(r'^---\n(.*?)\n---\n', content, re.DOTALL)
                 if match:
@@ -462,18 +1309,20 @@ class ZettelkastenHelper:
                     if not any(tag in tags for tag in tag_filters):
                         continue
                 
-                if after_date and created:
+                if (after_date or before_date) and created:
                     if hasattr(created, 'strftime'):
                         created_str = created.strftime('%Y-%m-%d')
                     else:
                         created_str = str(created)
-                    if created_str < after_date:
+                    if after_date and created_str < after_date:
+                        continue
+                    if before_date and created_str >= before_date:
                         continue
                 
                 # MOC 링크 찾기
                 moc_links = re.findall(r'\[\[맵-[^\]]+\]\]', content)
                 
-                concepts.append({
+                record = {
                     'filename': file_path.name,
                     'title': file_path.stem.replace('개념-', ''),
                     'path': str(file_path.relative_to(self.docs_root)),
@@ -481,29 +1330,842 @@ class ZettelkastenHelper:
                     'tags': tags,
                     'created': created.strftime('%Y-%m-%d') if hasattr(created, 'strftime') else str(created),
                     'moc_links': len(moc_links)
-                })
+                }
             except Exception:
                 continue
-        
-        return {
-            'concepts': concepts,
-            'count': len(concepts)
-        }
+            
+            yield record
     
-    def load_specs_for_scenario(self, scenario: str) -> Dict[str, Any]:
+    def map_io(self, func: Callable[[Any], Any], items: Iterable[Any]) -> Iterator[Any]:
         """
-        시나리오별 spec 파일 동적 로드
-        loader.sh의 기능을 Python으로 구현
+        I/O 바운드 작업을 bounded thread pool로 동시에 실행하고 입력 순서대로 결과 반환
+        - 동시에 진행 중인 작업은 io_workers * 2개로 제한 (스트리밍 시 메모리 일정)
+        - 소비자가 중간에 멈추면 아직 시작하지 않은 작업은 취소
         """
+        if self.io_workers <= 1:
+            for item in items:
+                yield func(item)
+            return
+        
+        window = self.io_workers * 2
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix='zk-io') as pool:
+            try:
+                for item in items:
+                    pending.append(pool.submit(func, item))
+                    if len(pending) >= window:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+    
+    def read_texts(self, paths: Iterable[Path]) -> Iterator[Tuple[Path, Optional[str], Optional[Exception]]]:
+        """여러 파일을 동시에 읽어 (path, content, error)를 입력 순서대로 반환"""
+        def read(path: Path) -> Tuple[Path, Optional[str], Optional[Exception]]:
+            try:
+                return path, path.read_text(encoding='utf-8'), None
+            except Exception as e:
+                return path, None, e
+        
+        return self.map_io(read, paths)
+    
+    def _iter_note_files(self, directory: Path, prefix: str) -> Iterator[Path]:
+        """os.scandir 기반 노트 파일 제너레이터 - 전체 목록을 메모리에 만들지 않음"""
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not (entry.name.startswith(prefix) and entry.name.endswith('.md')):
+                    continue
+                try:
+                    if entry.is_file():
+                        yield Path(entry.path)
+                except OSError:
+                    continue
+    
+    def _indexed_outside(self, path: Path, candidates: set) -> bool:
+        """인덱스 기록이 최신이고 created가 있는데 후보 범위 밖인 노트인지 (stat만 사용)"""
+        rel = path.relative_to(self.docs_root).as_posix()
+        if rel in candidates:
+            return False
+        record = self.state.get('notes', rel)
+        if not record or record.get('v') != NOTE_INDEX_VERSION or not record.get('created'):
+            return False
         try:
-            # 시나리오 설정 가져오기
-            scenario_config = self.config['scenarios'].get(scenario)
-            if not scenario_config:
-                # 기본 시나리오 찾기
-                default_scenario = 'search'
-                for name, config in self.config['scenarios'].items():
-                    if config.get('is_default', False):
-                        default_scenario = name
+            stat = path.stat()
+        except OSError:
+            return False
+        return record['mtime_ns'] == stat.st_mtime_ns and record['size'] == stat.st_size
+    
+    def _walk_notes(self, directory: Path) -> Iterator[os.DirEntry]:
+        """vault 하위 *.md 파일을 재귀적으로 순회 (숨김 폴더, 90-설정 제외)"""
+        try:
+            with os.scandir(directory) as entries:
+                subdirs = []
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    try:
+                        if entry.is_dir():
+                            if entry.name != '90-설정':
+                                subdirs.append(entry.path)
+                        elif entry.name.endswith('.md') and entry.is_file():
+                            yield entry
+                    except OSError:
+                        continue
+        except OSError as e:
+            self.logger.warning(f"Cannot scan {directory}: {e}")
+            return
+        
+        for subdir in subdirs:
+            yield from self._walk_notes(Path(subdir))
+    
+    def _date_str(self, value: Any) -> Optional[str]:
+        """frontmatter 날짜 값을 'YYYY-MM-DD' 형식 문자열로 정규화"""
+        if value is None:
+            return None
+        if hasattr(value, 'strftime'):
+            return value.strftime('%Y-%m-%d')
+        return str(value)
+    
+    def refresh_note_index(self) -> Dict[str, int]:
+        """
+        노트 메타데이터 인덱스 갱신 (증분)
+        - stat(mtime/size)이 바뀐 노트만 다시 읽어 frontmatter 파싱
+        """
+        seen = set()
+        changed = []
+        for entry in self._walk_notes(self.docs_root):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            rel = Path(entry.path).relative_to(self.docs_root).as_posix()
+            seen.add(rel)
+            record = self.state.get('notes', rel)
+            if record and record.get('v') == NOTE_INDEX_VERSION and \
+                    record['mtime_ns'] == stat.st_mtime_ns and record['size'] == stat.st_size:
+                continue
+            changed.append((rel, stat))
+        
+        # 변경된 노트만 동시에 읽어 메타데이터 추출
+        for (rel, stat), (_, content, error) in zip(
+                changed, self.read_texts(self.docs_root / rel for rel, _ in changed)):
+            frontmatter = {}
+            links = []
+            if not error:
+                # 위키링크 대상 (별칭 |, 헤딩 # 제거)
+                links = sorted({link.split('|', 1)[0].split('#', 1)[0].strip()
+                                for link in re.findall(r'\[\[([^\]]+)\]\]', content)} - {''})
+                match = re.match(r'^---\n(.*?)\n---\n', content, re.DOTALL)
+                if match:
+                    try:
+                        frontmatter = yaml.safe_load(match.group(1)) or {}
+                    except yaml.YAMLError:
+                        frontmatter = {}
+                if not isinstance(frontmatter, dict):
+                    frontmatter = {}
+            record = {
+                'v': NOTE_INDEX_VERSION,
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'mtime': datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%dT%H:%M:%S'),
+                'created': self._date_str(frontmatter.get('created')),
+                'updated': self._date_str(frontmatter.get('updated')),
+                'type': frontmatter.get('type'),
+                'status': frontmatter.get('status'),
+                'links': links,
+                'frontmatter': self._make_json_serializable(frontmatter),
+                'hash': hashlib.sha256(content.encode('utf-8')).hexdigest()[:16] if content is not None else None
+            }
+            self.state.put('notes', rel, record)
+            # 날짜 인덱스 증분 갱신 (SQLite 인덱스 컬럼)
+            for field in DATE_INDEX_FIELDS:
+                if record[field]:
+                    self.state.put_ordered(f"date:{field}", rel, record[field])
+                else:
+                    self.state.delete_ordered(f"date:{field}", rel)
+        
+        # 사라진 노트 제거
+        removed = [rel for rel in self.state.keys('notes') if rel not in seen]
+        for rel in removed:
+            self.state.delete('notes', rel)
+            for field in DATE_INDEX_FIELDS:
+                self.state.delete_ordered(f"date:{field}", rel)
+        
+        if self.state.get('date_index', 'fields') is not None:
+            # 이전 형식(정렬 목록 한 덩어리) 날짜 인덱스 정리
+            self.state.delete('date_index', 'fields')
+        self.state.put('date_index', 'refreshed_at', datetime.now().timestamp())
+        self.state.flush()
+        
+        self.logger.info(f"Note index refreshed: {len(seen)} scanned, {len(changed)} parsed, {len(removed)} removed")
+        return {'scanned': len(seen), 'parsed': len(changed), 'removed': len(removed)}
+    
+    def _ensure_note_index(self, refresh: Optional[bool] = None):
+        """
+        인덱스 준비 - refresh=None이면 index.refresh_interval이 지났을 때만 vault 스캔
+        """
+        if refresh is None:
+            interval = self.config.get('index', {}).get('refresh_interval', 300)
+            refreshed_at = self.state.get('date_index', 'refreshed_at')
+            refresh = refreshed_at is None or datetime.now().timestamp() - refreshed_at > interval
+        if refresh:
+            self.refresh_note_index()
+    
+    def _date_range(self, field: str, after: Optional[str] = None, before: Optional[str] = None) -> List[str]:
+        """
+        날짜 인덱스(SQLite 인덱스 컬럼)에서 범위 안의 노트 경로 반환
+        after는 포함(>=), before는 제외(<)
+        """
+        return self.state.range(f"date:{field}", after, before)
+    
+    def query_dates(self, query: Optional[Dict] = None, refresh: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        날짜 범위 질의 (created/updated/mtime)
+        
+        query 키:
+        - field: 'created' | 'updated' | 'mtime' (기본 created)
+        - after_date / before_date / between: [시작, 끝] (끝 날짜 포함)
+        - within_days / older_than_days: 오늘 기준 상대 기간
+        - folder, type, status: 추가 필터
+        """
+        query = query or {}
+        field = query.get('field', 'created')
+        if field not in DATE_INDEX_FIELDS:
+            return {'error': f'Unknown date field: {field} (use {", ".join(DATE_INDEX_FIELDS)})'}
+        
+        after, before = self._date_bounds(query)
+        self._ensure_note_index(refresh)
+        
+        folder = query.get('folder')
+        folder_prefix = f"{folder.rstrip('/')}/" if folder else None
+        notes = []
+        for rel in self._date_range(field, after, before):
+            record = self.state.get('notes', rel) or {}
+            if folder_prefix and not rel.startswith(folder_prefix):
+                continue
+            if query.get('type') and record.get('type') != query['type']:
+                continue
+            if query.get('status') and record.get('status') != query['status']:
+                continue
+            notes.append({
+                'path': rel,
+                'full_path': str(self.docs_root / rel),
+                'type': record.get('type'),
+                'status': record.get('status'),
+                'created': record.get('created'),
+                'updated': record.get('updated'),
+                'mtime': record.get('mtime')
+            })
+        
+        return {
+            'field': field,
+            'after': after,
+            'before': before,
+            'notes': notes,
+            'count': len(notes)
+        }
+    
+    def _date_bounds(self, query: Dict) -> Tuple[Optional[str], Optional[str]]:
+        """질의 조건을 [after, before) 문자열 범위로 변환"""
+        after = query.get('after_date')
+        before = query.get('before_date')
+        
+        between = query.get('between')
+        if between:
+            start, end = between
+            after = max(filter(None, [after, start]), default=None)
+            # 끝 날짜는 그날 전체 포함 ('2024-11-04T..' < '2024-11-04~')
+            end = f"{end}~"
+            before = min(filter(None, [before, end]), default=None)
+        
+        today = datetime.now()
+        if query.get('within_days') is not None:
+            since = (today - timedelta(days=int(query['within_days']))).strftime('%Y-%m-%d')
+            after = max(filter(None, [after, since]), default=None)
+        if query.get('older_than_days') is not None:
+            until = (today - timedelta(days=int(query['older_than_days']))).strftime('%Y-%m-%d')
+            before = min(filter(None, [before, until]), default=None)
+        
+        return after, before
+    
+    def archive_candidates(self, days: int = 365, refresh: Optional[bool] = None) -> Dict[str, Any]:
+        """보관 후보 - days일 이상 수정되지 않은 노트 (80-보관 제외, 인덱스만 사용)"""
+        result = self.query_dates({'field': 'mtime', 'older_than_days': days}, refresh)
+        archive_prefix = self.config.get('attachments', {}).get('base_path', '80-보관/첨부파일').split('/')[0] + '/'
+        candidates = [note for note in result['notes'] if not note['path'].startswith(archive_prefix)]
+        return {
+            'days': days,
+            'before': result['before'],
+            'candidates': candidates,
+            'count': len(candidates)
+        }
+    
+    def triage(self, limit: Optional[int] = None, refresh: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        즉흥메모 inbox triage - pending 메모를 한 번씩만 읽어 미완료 작업/경과일 추출
+        시나리오 정의(설명, 트리거 키워드, 검증 규칙)와 정리/개념/MOC 태그 겹침으로 목표 시나리오 점수화
+        결과는 목표가 있는 메모 → 점수 내림차순 → 오래된 순
+        """
+        scenarios = self.config['scenarios']
+        inbox = self.docs_root / scenarios['capture']['path']
+        if not inbox.exists():
+            return {
+                'error': f'Inbox not found: {inbox}'
+            }
+        
+        settings = self.config.get('triage', {})
+        targets = [name for name in settings.get('targets', ['process', 'create']) if name in scenarios]
+        min_score = settings.get('min_score', 0.2)
+        max_tasks = settings.get('max_tasks', 3)
+        suggestions = self.config.get('suggestions', {})
+        weights = suggestions.get('similarity_weights', {})
+        moc_settings = suggestions.get('moc', {})
+        
+        # 태그 어휘는 노트 인덱스에서 가져옴 (정리/개념/MOC 본문은 읽지 않음)
+        self._ensure_note_index(refresh)
+        vocabulary = self._triage_vocabulary(targets)
+        keywords = {name: self._scenario_keywords(name) for name in targets}
+        
+        today = datetime.now().date()
+        queue = []
+        for path, content, error in self.read_texts(self._iter_note_files(inbox, '')):
+            if error:
+                continue
+            
+            frontmatter = {}
+            match = re.match(r'^---\n(.*?)\n---\n', content, re.DOTALL)
+            if match:
+                try:
+                    frontmatter = yaml.safe_load(match.group(1)) or {}
+                except yaml.YAMLError:
+                    frontmatter = {}
+            if not isinstance(frontmatter, dict):
+                frontmatter = {}
+            if frontmatter.get('status', 'pending') != 'pending':
+                continue
+            body = content[match.end():] if match else content
+            
+            # 경과일: created → 파일명 날짜 → 수정일 순
+            created = self._date_str(frontmatter.get('created'))
+            if not created:
+                digits = re.match(r'(\d{4})(\d{2})(\d{2})', path.name)
+                created = '-'.join(digits.groups()) if digits else \
+                    datetime.fromtimestamp(path.stat().st_mtime).strftime('%Y-%m-%d')
+            try:
+                age_days = (today - datetime.strptime(created[:10], '%Y-%m-%d').date()).days
+            except ValueError:
+                age_days = None
+            
+            tasks = [task.strip() for task in TRIAGE_TASK_RE.findall(body)]
+            priority = next((label for mark, label in TRIAGE_PRIORITIES
+                             if any(mark in task for task in tasks)), None)
+            
+            tags = self._note_tags(frontmatter.get('tags')) | self._note_tags(TRIAGE_TAG_RE.findall(body))
+            links = {link.split('|', 1)[0].split('#', 1)[0].strip()
+                     for link in re.findall(r'\[\[([^\]]+)\]\]', content)}
+            has_source = bool(links & vocabulary['sources']) or 'http://' in body or 'https://' in body
+            title = path.stem.casefold()
+            text = body.casefold()
+            
+            scores = {}
+            for name in targets:
+                tag_score = len(tags & vocabulary['tags'][name]) / len(tags) if tags else 0.0
+                title_score = 1.0 if any(keyword in title for keyword in keywords[name]) else 0.0
+                content_score = sum(1 for keyword in keywords[name] if keyword in text) / 2
+                if has_source and 'source_must_be_원문' in scenarios[name].get('validation', []):
+                    content_score += 0.5
+                scores[name] = round(weights.get('tag_match', 0.5) * tag_score +
+                                     weights.get('title_similarity', 0.3) * title_score +
+                                     weights.get('content_relevance', 0.2) * min(1.0, content_score), 3)
+            
+            best = max(scores, key=scores.get) if scores else None
+            score = scores[best] if best else 0.0
+            target = best if score >= min_score else None
+            
+            # 연결할 MOC 제안 (suggestions.moc 설정)
+            mocs = []
+            if target in moc_settings.get('triggers', []):
+                shared = sorted(((len(tags & moc_tags), stem) for stem, moc_tags in vocabulary['mocs'].items()),
+                                key=lambda item: (-item[0], item[1]))
+                mocs = [stem for count, stem in shared
+                        if count >= moc_settings.get('min_tag_matches', 1)][:moc_settings.get('max_suggestions', 3)]
+            
+            queue.append({
+                'path': path.relative_to(self.docs_root).as_posix(),
+                'target': target,
+                'score': score,
+                'scores': scores,
+                'age_days': age_days,
+                'open_tasks': len(tasks),
+                'priority': priority,
+                'tasks': tasks[:max_tasks],
+                'tags': sorted(tags),
+                'mocs': mocs
+            })
+        
+        queue.sort(key=lambda item: (item['target'] is None, -item['score'], -(item['age_days'] or 0), item['path']))
+        
+        summary = {name: 0 for name in targets}
+        summary['unclassified'] = 0
+        for item in queue:
+            summary[item['target'] or 'unclassified'] += 1
+        
+        return {
+            'inbox': scenarios['capture']['path'],
+            'count': len(queue),
+            'summary': summary,
+            'open_tasks': sum(item['open_tasks'] for item in queue),
+            'queue': queue[:limit] if limit is not None else queue
+        }
+    
+    def _triage_vocabulary(self, targets: List[str]) -> Dict[str, Any]:
+        """인덱스에서 대상 시나리오별 태그 집합, MOC별 태그, 원문 노트 이름 수집"""
+        scenarios = self.config['scenarios']
+        suggestions = self.config.get('suggestions', {})
+        
+        def folder(path: Optional[str]) -> Optional[str]:
+            return f"{path.rstrip('/')}/" if path else None
+        
+        target_folders = {name: folder(scenarios[name].get('path')) for name in targets}
+        moc_folder = folder(scenarios.get('connect', {}).get('path'))
+        concept_folder = folder(scenarios.get('create', {}).get('path'))
+        source_folder = folder(self.config.get('triage', {}).get('source_path', '10-수집/원문'))
+        
+        tags = {name: set() for name in targets}
+        moc_tags, concept_tags = set(), set()
+        mocs = {}
+        sources = set()
+        for rel, record in self.state.items('notes'):
+            note_tags = self._note_tags(record.get('frontmatter', {}).get('tags'))
+            for name, prefix in target_folders.items():
+                if prefix and rel.startswith(prefix):
+                    tags[name] |= note_tags
+            if moc_folder and rel.startswith(moc_folder):
+                moc_tags |= note_tags
+                mocs[Path(rel).stem] = note_tags
+            if concept_folder and rel.startswith(concept_folder):
+                concept_tags |= note_tags
+            if source_folder and rel.startswith(source_folder):
+                sources.add(Path(rel).stem)
+        
+        for name in targets:
+            if name in suggestions.get('moc', {}).get('triggers', []):
+                tags[name] |= moc_tags
+            if name in suggestions.get('concept', {}).get('triggers', []):
+                tags[name] |= concept_tags
+        
+        return {'tags': tags, 'mocs': mocs, 'sources': sources}
+    
+    def _scenario_keywords(self, scenario: str) -> List[str]:
+        """시나리오 설명과 spec의 '트리거 키워드' 항목에서 매칭용 키워드 추출"""
+        config = self.config['scenarios'].get(scenario, {})
+        phrases = [config.get('description', '').split('(')[0]]
+        for spec_file in config.get('spec_files', [])[:1]:
+            spec_path = self.docs_root / '90-설정' / 'specs' / spec_file
+            try:
+                spec = spec_path.read_text(encoding='utf-8')
+            except OSError:
+                continue
+            section = re.search(r'^## 트리거 키워드\n(.*?)(?=^## |\Z)', spec, re.MULTILINE | re.DOTALL)
+            if section:
+                phrases.extend(re.findall(r'"([^"]+)"', section.group(1)))
+        
+        keywords = []
+        for word in ' '.join(phrases).casefold().split():
+            # "정리해줘" → "정리", "만들어줘" 같은 요청 동사는 제외
+            if word.endswith('해줘'):
+                word = word[:-2]
+            elif word.endswith('줘'):
+                continue
+            if len(word) >= 2 and word not in keywords:
+                keywords.append(word)
+        return keywords
+    
+    def _note_tags(self, tags: Any) -> set:
+        """태그 비교용 정규화 - '#', 대소문자, 상위 계층(literature/ai → ai) 제거"""
+        if not tags:
+            return set()
+        if isinstance(tags, str):
+            tags = tags.replace(',', ' ').split()
+        normalized = {str(tag).strip().lstrip('#').casefold().rsplit('/', 1)[-1] for tag in tags}
+        normalized.discard('')
+        return normalized
+    
+    def record_command(self, command: str, seconds: float, status: str):
+        """명령 실행 시간을 metrics 로그에 한 줄 append (집계는 metrics 명령에서)"""
+        if not self.state.enabled or not self.config.get('metrics', {}).get('enabled', True):
+            return
+        line = json.dumps({'command': command, 'seconds': round(seconds, 6), 'status': status}) + '\n'
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # O_APPEND 단일 write - 동시에 실행된 프로세스끼리 줄이 섞이지 않음
+            fd = os.open(self.cache_dir / 'metrics.log', os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line.encode('utf-8'))
+            finally:
+                os.close(fd)
+        except OSError as e:
+            self.logger.debug(f"Failed to record metrics: {e}")
+    
+    def _collect_command_metrics(self) -> Dict[str, Any]:
+        """
+        metrics 로그를 누적 집계(카운터/히스토그램)에 합침
+        - 로그를 고유한 이름으로 옮긴(claim) 뒤, 남아 있는 claim 파일과 함께 한 쓰기 트랜잭션에서 집계
+        - 반영한 claim 이름을 같은 트랜잭션에 기록하고 commit 후에 파일 삭제 (중간에 끊겨도 중복/유실 없음)
+        """
+        log_path = self.cache_dir / 'metrics.log'
+        if log_path.exists():
+            # 로그를 먼저 옮겨서 집계 중에 들어오는 기록은 새 로그에 쌓이게 함
+            try:
+                os.replace(log_path, log_path.with_name(f"metrics.log.{os.getpid()}-{time.time_ns()}"))
+            except OSError as e:
+                self.logger.warning(f"Cannot claim metrics log: {e}")
+        
+        claims = {}
+        for claimed in sorted(self.cache_dir.glob('metrics.log.*')):
+            try:
+                claims[claimed.name] = claimed.read_text(encoding='utf-8').splitlines()
+            except OSError:
+                continue  # 다른 실행이 이미 반영하고 삭제함
+        if not claims:
+            return self.state.get('metrics', 'commands') or {}
+        
+        def fold(current: Dict[str, Any]) -> Dict[str, Any]:
+            totals = current['commands'] or {}
+            # 파일이 사라진 claim 이름은 더 필요 없으므로 정리
+            applied = [name for name in current['applied_logs'] or [] if (self.cache_dir / name).exists()]
+            for name, lines in claims.items():
+                # 다른 실행이 이미 반영한 claim은 건너뜀
+                if name in applied or not (self.cache_dir / name).exists():
+                    continue
+                for line in lines:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue
+                    entry = totals.setdefault(event['command'], {
+                        'buckets': [0] * len(LATENCY_BUCKETS),
+                        'sum': 0.0,
+                        'count': 0,
+                        'status': {}
+                    })
+                    for i, bound in enumerate(LATENCY_BUCKETS):
+                        if event['seconds'] <= bound:
+                            entry['buckets'][i] += 1
+                    entry['sum'] += event['seconds']
+                    entry['count'] += 1
+                    entry['status'][event['status']] = entry['status'].get(event['status'], 0) + 1
+                applied.append(name)
+            return {'commands': totals, 'applied_logs': applied}
+        
+        try:
+            updated = self.state.update('metrics', ['commands', 'applied_logs'], fold)
+        except sqlite3.Error as e:
+            # claim 파일은 남겨 두고 다음 실행에서 다시 집계
+            self.logger.warning(f"Cannot update metrics totals: {e}")
+            return self.state.get('metrics', 'commands') or {}
+        
+        for name in updated['applied_logs']:
+            try:
+                (self.cache_dir / name).unlink()
+            except OSError:
+                pass
+        
+        return updated['commands']
+    
+    def vault_stats(self, refresh: Optional[bool] = None) -> Dict[str, Any]:
+        """노트 인덱스 기반 vault 통계 - 폴더별 노트 수, 고립 노트, 깨진 링크"""
+        self._ensure_note_index(refresh)
+        notes = self.state.items('notes')
+        
+        folders = {}
+        stems = set()
+        for rel, _ in notes:
+            folder = rel.split('/', 1)[0] if '/' in rel else '.'
+            folders[folder] = folders.get(folder, 0) + 1
+            stems.add(Path(rel).stem)
+        
+        backlinks = {}
+        broken = 0
+        for rel, record in notes:
+            for target in record.get('links', []):
+                # 첨부파일 임베드 (![[image.png]]) 등 노트가 아닌 링크는 제외
+                suffix = Path(target).suffix.lower()
+                if suffix and suffix != '.md':
+                    continue
+                stem = Path(target).stem if suffix else Path(target).name
+                if stem in stems:
+                    backlinks[stem] = backlinks.get(stem, 0) + 1
+                else:
+                    broken += 1
+        
+        orphan_scope = tuple(f"{folder}/" for folder in
+                             self.config.get('metrics', {}).get('orphan_scope', ['20-정리', '30-연결']))
+        orphans = [rel for rel, _ in notes
+                   if rel.startswith(orphan_scope) and not backlinks.get(Path(rel).stem)]
+        
+        return {
+            'notes_by_folder': folders,
+            'notes': len(notes),
+            'orphans': len(orphans),
+            'broken_links': broken
+        }
+    
+    def export_metrics(self, refresh: Optional[bool] = None) -> str:
+        """명령 지연시간/횟수 + vault 게이지를 Prometheus text format으로 반환"""
+        commands = self._collect_command_metrics()
+        stats = self.vault_stats(refresh)
+        
+        lines = [
+            '# HELP zk_command_duration_seconds Latency of orchestrator.py commands.',
+            '# TYPE zk_command_duration_seconds histogram'
+        ]
+        for command in sorted(commands):
+            entry = commands[command]
+            label = f'command="{_prom_escape(command)}"'
+            for bound, count in zip(LATENCY_BUCKETS, entry['buckets']):
+                lines.append(f'zk_command_duration_seconds_bucket{{{label},le="{bound}"}} {count}')
+            lines.append(f'zk_command_duration_seconds_bucket{{{label},le="+Inf"}} {entry["count"]}')
+            lines.append(f'zk_command_duration_seconds_sum{{{label}}} {entry["sum"]:.6f}')
+            lines.append(f'zk_command_duration_seconds_count{{{label}}} {entry["count"]}')
+        
+        lines += [
+            '# HELP zk_command_total Number of orchestrator.py command runs by exit status.',
+            '# TYPE zk_command_total counter'
+        ]
+        for command in sorted(commands):
+            for status, count in sorted(commands[command]['status'].items()):
+                lines.append(f'zk_command_total{{command="{_prom_escape(command)}",status="{_prom_escape(status)}"}} {count}')
+        
+        lines += [
+            '# HELP zk_vault_notes Number of notes per top-level folder.',
+            '# TYPE zk_vault_notes gauge'
+        ]
+        for folder, count in sorted(stats['notes_by_folder'].items()):
+            lines.append(f'zk_vault_notes{{folder="{_prom_escape(folder)}"}} {count}')
+        
+        lines += [
+            '# HELP zk_vault_orphan_notes Notes without backlinks (metrics.orphan_scope).',
+            '# TYPE zk_vault_orphan_notes gauge',
+            f'zk_vault_orphan_notes {stats["orphans"]}',
+            '# HELP zk_vault_broken_links Wikilinks whose target note does not exist.',
+            '# TYPE zk_vault_broken_links gauge',
+            f'zk_vault_broken_links {stats["broken_links"]}'
+        ]
+        
+        return '\n'.join(lines) + '\n'
+    
+    def export_snapshot(self, fmt: str, out_dir: str, since: Optional[str] = None,
+                        refresh: Optional[bool] = True) -> Dict[str, Any]:
+        """
+        노트/frontmatter/링크 그래프 스냅샷 export
+        - fmt: 'msgpack' | 'parquet' | 'graphml'
+        - since: 이전 스냅샷 ID - 그 이후 추가/변경된 노트만 내보내고 삭제된 노트는 manifest에 기록
+        """
+        if fmt not in EXPORT_FORMATS:
+            return {'error': f'Unknown export format: {fmt} (use {", ".join(EXPORT_FORMATS)})'}
+        
+        self._ensure_note_index(refresh)
+        notes = dict(self.state.items('notes'))
+        manifest = {rel: record.get('hash') for rel, record in notes.items()}
+        
+        deleted = []
+        if since:
+            previous = self.state.get('snapshots', since)
+            if previous is None:
+                return {'error': f'Unknown snapshot: {since}'}
+            changed = [rel for rel, digest in manifest.items() if previous['notes'].get(rel) != digest]
+            deleted = sorted(set(previous['notes']) - set(manifest))
+        else:
+            changed = list(manifest)
+        changed.sort()
+        
+        # 링크 대상 파일명(stem) → 노트 경로
+        by_stem = {Path(rel).stem: rel for rel in notes}
+        rows = []
+        edges = []
+        for rel in changed:
+            record = notes[rel]
+            frontmatter = record.get('frontmatter') or {}
+            tags = frontmatter.get('tags') or []
+            rows.append({
+                'path': rel,
+                'title': str(frontmatter.get('title') or Path(rel).stem),
+                'type': record.get('type'),
+                'status': record.get('status'),
+                'created': record.get('created'),
+                'updated': record.get('updated'),
+                'mtime': record.get('mtime'),
+                'tags': [str(tag) for tag in tags] if isinstance(tags, list) else [str(tags)],
+                'frontmatter': json.dumps(frontmatter, ensure_ascii=False),
+                'hash': record.get('hash')
+            })
+            for target in record.get('links', []):
+                resolved = by_stem.get(Path(target).stem if target.endswith('.md') else target)
+                edges.append({
+                    'source': rel,
+                    'target': resolved or target,
+                    'resolved': resolved is not None
+                })
+        
+        snapshot_id = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{self._hash_json(manifest)[:8]}"
+        out = Path(out_dir)
+        try:
+            out.mkdir(parents=True, exist_ok=True)
+            files = getattr(self, f'_export_{fmt}')(out, rows, edges)
+            summary = {
+                'snapshot_id': snapshot_id,
+                'since': since,
+                'format': fmt,
+                'notes': len(rows),
+                'edges': len(edges),
+                'deleted': deleted,
+                'files': [str(out / name) for name in files]
+            }
+            (out / 'manifest.json').write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding='utf-8')
+        except ImportError as e:
+            return {'error': f'{fmt} export requires an optional package: {e}'}
+        except OSError as e:
+            return {'error': f'Cannot write export: {e}'}
+        
+        # 다음 delta export 기준점 저장 (오래된 스냅샷부터 정리)
+        self.state.put('snapshots', snapshot_id, {'created_at': datetime.now().isoformat(), 'notes': manifest})
+        keep = self.config.get('export', {}).get('keep_snapshots', 10)
+        for old_id in sorted(self.state.keys('snapshots'))[:-keep]:
+            self.state.delete('snapshots', old_id)
+        self.state.flush()
+        
+        self.logger.info(f"Exported snapshot {snapshot_id}: {len(rows)} notes, {len(edges)} edges ({fmt})")
+        return summary
+    
+    def _export_msgpack(self, out: Path, rows: List[Dict], edges: List[Dict]) -> List[str]:
+        import msgpack
+        (out / 'notes.msgpack').write_bytes(msgpack.packb(rows, use_bin_type=True))
+        (out / 'edges.msgpack').write_bytes(msgpack.packb(edges, use_bin_type=True))
+        return ['notes.msgpack', 'edges.msgpack']
+    
+    def _export_parquet(self, out: Path, rows: List[Dict], edges: List[Dict]) -> List[str]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        note_columns = ['path', 'title', 'type', 'status', 'created', 'updated', 'mtime', 'tags', 'frontmatter', 'hash']
+        notes_table = pa.table({
+            column: pa.array([row[column] for row in rows],
+                             type=pa.list_(pa.string()) if column == 'tags' else pa.string())
+            for column in note_columns
+        })
+        edges_table = pa.table({
+            'source': pa.array([edge['source'] for edge in edges], type=pa.string()),
+            'target': pa.array([edge['target'] for edge in edges], type=pa.string()),
+            'resolved': pa.array([edge['resolved'] for edge in edges], type=pa.bool_())
+        })
+        pq.write_table(notes_table, out / 'notes.parquet')
+        pq.write_table(edges_table, out / 'edges.parquet')
+        return ['notes.parquet', 'edges.parquet']
+    
+    def _export_graphml(self, out: Path, rows: List[Dict], edges: List[Dict]) -> List[str]:
+        import xml.etree.ElementTree as ET
+        root = ET.Element('graphml', xmlns='http://graphml.graphdrawing.org/xmlns')
+        node_keys = ['title', 'type', 'status', 'created', 'updated', 'tags']
+        for key in node_keys:
+            ET.SubElement(root, 'key', {'id': key, 'for': 'node', 'attr.name': key, 'attr.type': 'string'})
+        ET.SubElement(root, 'key', {'id': 'stub', 'for': 'node', 'attr.name': 'stub', 'attr.type': 'string'})
+        ET.SubElement(root, 'key', {'id': 'resolved', 'for': 'edge', 'attr.name': 'resolved', 'attr.type': 'boolean'})
+        
+        graph = ET.SubElement(root, 'graph', id='vault', edgedefault='directed')
+        declared = set()
+        for row in rows:
+            node = ET.SubElement(graph, 'node', id=row['path'])
+            declared.add(row['path'])
+            for key in node_keys:
+                value = ','.join(row[key]) if key == 'tags' else row[key]
+                if value:
+                    ET.SubElement(node, 'data', key=key).text = str(value)
+        # 엣지 끝점은 모두 node로 선언 - 없는 노트(unresolved)와 delta에서 빠진 노트(unchanged)는 stub
+        for edge in edges:
+            for endpoint in (edge['source'], edge['target']):
+                if endpoint in declared:
+                    continue
+                node = ET.SubElement(graph, 'node', id=endpoint)
+                stub = 'unchanged' if edge['resolved'] or endpoint == edge['source'] else 'unresolved'
+                ET.SubElement(node, 'data', key='stub').text = stub
+                declared.add(endpoint)
+        for i, edge in enumerate(edges):
+            element = ET.SubElement(graph, 'edge', id=f"e{i}", source=edge['source'], target=edge['target'])
+            ET.SubElement(element, 'data', key='resolved').text = 'true' if edge['resolved'] else 'false'
+        
+        ET.ElementTree(root).write(out / 'graph.graphml', encoding='utf-8', xml_declaration=True)
+        return ['graph.graphml']
+    
+    def search(self, query: str, filters: Optional[Dict] = None, content: bool = False,
+               refresh: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        노트 검색 - 파일명/제목/태그 부분 일치 (content=True면 본문까지)
+        결과는 수정일 내림차순
+        filters: tags (하나라도 일치), folder
+        """
+        self._ensure_note_index(refresh)
+        filters = filters or {}
+        needle = query.casefold()
+        tag_filters = filters.get('tags', [])
+        folder = filters.get('folder')
+        folder_prefix = f"{folder.rstrip('/')}/" if folder else None
+        
+        results = []
+        body_candidates = []
+        for rel, record in self.state.items('notes'):
+            if folder_prefix and not rel.startswith(folder_prefix):
+                continue
+            frontmatter = record.get('frontmatter') or {}
+            tags = frontmatter.get('tags') or []
+            tags = [str(tag) for tag in tags] if isinstance(tags, list) else [str(tags)]
+            if tag_filters and not any(tag in tags for tag in tag_filters):
+                continue
+            
+            note = {
+                'path': rel,
+                'full_path': str(self.docs_root / rel),
+                'title': str(frontmatter.get('title') or Path(rel).stem),
+                'type': record.get('type'),
+                'tags': tags,
+                'mtime': record.get('mtime')
+            }
+            if needle in Path(rel).stem.casefold() or needle in note['title'].casefold():
+                results.append(dict(note, match='title'))
+            elif any(needle in tag.casefold() for tag in tags):
+                results.append(dict(note, match='tags'))
+            elif content:
+                body_candidates.append(note)
+        
+        # 본문 검색은 제목/태그로 못 찾은 노트만 동시에 읽어서 확인
+        for note, (_, text, error) in zip(
+                body_candidates, self.read_texts(Path(note['full_path']) for note in body_candidates)):
+            if not error and needle in text.casefold():
+                results.append(dict(note, match='content'))
+        
+        results.sort(key=lambda note: note['mtime'] or '', reverse=True)
+        
+        return {
+            'query': query,
+            'results': results,
+            'count': len(results)
+        }
+    
+    def load_specs_for_scenario(self, scenario: str) -> Dict[str, Any]:
+        """
+        시나리오별 spec 파일 동적 로드
+        loader.sh의 기능을 Python으로 구현
+        """
+        try:
+            # 시나리오 설정 가져오기
+            scenario_config = self.config['scenarios'].get(scenario)
+            if not scenario_config:
+                # 기본 시나리오 찾기
+                default_scenario = 'search'
+                for name, config in self.config['scenarios'].items():
+                    if config.get('is_default', False):
+                        default_scenario = name
                         break
                 
                 self.logger.warning(f"Unknown scenario '{scenario}', using default '{default_scenario}'")
@@ -644,7 +2306,9 @@ class ZettelkastenHelper:
                     }
                 }
             
-            # 3. 실제 실행
+            # 3. 실제 실행 - 중단된 이전 작업이 있으면 먼저 마무리
+            self.journal.recover()
+            
             results = {
                 'success': True,
                 'executed': [],
@@ -652,44 +2316,57 @@ class ZettelkastenHelper:
                 'updated_links': []
             }
             
-            # 디렉토리 생성
+            # 작업 계획 (디렉토리 생성 → 파일 이동 → 링크 업데이트를 한 그룹으로)
+            ops = []
             if 'suggestions' in analysis and analysis['suggestions']:
                 first_suggestion = analysis['suggestions'][0]
                 attach_dir = Path(first_suggestion['full_path']).parent
                 
                 if not attach_dir.exists():
-                    attach_dir.mkdir(parents=True, exist_ok=True)
-                    results['executed'].append(f'Created directory: {attach_dir}')
-                    self.logger.info(f"Created directory: {attach_dir}")
+                    ops.append({'op': 'mkdir', 'path': str(attach_dir)})
             
-            # 파일 이동
+            planned = set()
             for suggestion in analysis.get('suggestions', []):
                 original = Path(suggestion['original'])
                 target = Path(suggestion['full_path'])
                 
+                if (original, target) in planned:
+                    continue
                 if original.exists():
-                    try:
-                        import shutil
-                        shutil.move(str(original), str(target))
-                        results['executed'].append(f'Moved: {original} -> {target}')
-                        self.logger.info(f"Moved file: {original} -> {target}")
-                    except Exception as e:
-                        results['failed'].append(f'Failed to move {original}: {e}')
-                        self.logger.error(f"Failed to move {original}: {e}")
+                    # journal은 다른 작업 디렉토리에서 복구될 수 있으므로 절대 경로로 기록
+                    ops.append({'op': 'move', 'src': os.path.abspath(original), 'dst': os.path.abspath(target)})
+                    planned.add((original, target))
                 else:
                     results['failed'].append(f'File not found: {original}')
             
-            # 링크 업데이트
-            if analysis.get('updated_links') and not dry_run:
+            if analysis.get('updated_links'):
                 updated_content = content
                 for original, replacement in analysis['updated_links'].items():
                     updated_content = updated_content.replace(original, replacement)
-                    results['updated_links'].append(f'{original} -> {replacement}')
-                
-                # 파일 저장
-                file_path.write_text(updated_content, encoding='utf-8')
-                results['executed'].append(f'Updated links in {filepath}')
-                self.logger.info(f"Updated links in {filepath}")
+                ops.append({'op': 'write', 'path': os.path.abspath(file_path), 'content': updated_content, 'before': content})
+            
+            # journal에 기록 후 일괄 실행 (실패 시 전체 되돌림)
+            outcome = self.journal.apply(ops)
+            for op in ops:
+                if outcome['failed']:
+                    break
+                if op['op'] == 'mkdir':
+                    results['executed'].append(f"Created directory: {op['path']}")
+                    self.logger.info(f"Created directory: {op['path']}")
+                elif op['op'] == 'move':
+                    results['executed'].append(f"Moved: {op['src']} -> {op['dst']}")
+                    self.logger.info(f"Moved file: {op['src']} -> {op['dst']}")
+                else:
+                    for original, replacement in analysis['updated_links'].items():
+                        results['updated_links'].append(f'{original} -> {replacement}')
+                    results['executed'].append(f'Updated links in {filepath}')
+                    self.logger.info(f"Updated links in {filepath}")
+            
+            for failure in outcome['failed']:
+                results['failed'].append(f"Failed to {failure['op']}: {failure['error']}")
+            if outcome['failed']:
+                results['success'] = False
+                results['rolled_back'] = outcome['rolled_back']
             
             return results
             
@@ -697,6 +2374,160 @@ class ZettelkastenHelper:
             self.logger.error(f"Error executing attachments: {e}")
             return {'error': str(e)}
     
+    def execute_attachments_batch(self, target: str, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        폴더/glob 단위 첨부파일 일괄 처리
+        - 노트 분석은 I/O 스레드 풀에서 병렬로 수행
+        - 모든 이동을 전역으로 계획: 여러 노트가 참조하는 같은 이미지는 한 번만 이동,
+          서로 다른 이미지의 파일명 충돌은 '파일명-1.확장자' 형식으로 해소,
+          이미 첨부파일 폴더에 있는 이미지는 건너뜀
+        - 디렉토리 생성/이동/링크 업데이트를 한 journal 그룹으로 실행
+        """
+        notes = self._resolve_note_targets(target)
+        if notes is None:
+            return {'error': f'No such folder or pattern: {target}'}
+        
+        attach_config = self.config.get('attachments', {})
+        base_dir = (self.docs_root / attach_config.get('base_path', '80-보관/첨부파일')).resolve()
+        attach_dir = base_dir / datetime.now().strftime(attach_config.get('date_format', '%Y%m%d'))
+        
+        def analyze(note: Path) -> Tuple[Path, Optional[str], List[Tuple[str, Optional[Path]]]]:
+            try:
+                content = note.read_text(encoding='utf-8')
+            except Exception as e:
+                self.logger.warning(f"Cannot read {note}: {e}")
+                return note, None, []
+            refs = []
+            for ref in dict.fromkeys(self._iter_attachment_refs(content)):
+                if ref.startswith(('http://', 'https://', '/')):
+                    continue
+                refs.append((ref, self._resolve_attachment(note, ref)))
+            return note, content, refs
+        
+        # 1. 전역 이동 계획
+        taken = {}
+        names = self._taken_names(attach_dir, taken)
+        moves = {}          # 원본 → 대상
+        note_links = []     # (노트, 내용, {참조: 대상})
+        skipped = []
+        missing = []
+        collisions = 0
+        for note, content, refs in self.map_io(analyze, notes):
+            mapping = {}
+            for ref, source in refs:
+                if source is None:
+                    missing.append({'note': str(note), 'ref': ref})
+                    continue
+                if base_dir in source.parents:
+                    skipped.append({'note': str(note), 'ref': ref})
+                    continue
+                if source not in moves:
+                    stem, suffix = os.path.splitext(source.name)
+                    filename = source.name
+                    counter = 0
+                    while self._filename_key(filename) in names:
+                        counter += 1
+                        filename = f"{stem}-{counter}{suffix}"
+                    if counter:
+                        collisions += 1
+                    names.add(self._filename_key(filename))
+                    moves[source] = attach_dir / filename
+                mapping[ref] = moves[source]
+            if mapping:
+                note_links.append((note, content, mapping))
+        
+        # 2. 링크 업데이트 내용 계산 (노트 위치 기준 상대 경로)
+        rewrites = []
+        for note, content, mapping in note_links:
+            links = {ref: Path(os.path.relpath(dst, note.resolve().parent)).as_posix()
+                     for ref, dst in mapping.items()}
+            rewrites.append((note, content, self._rewrite_attachment_links(content, links), links))
+        
+        plan = {
+            'notes_scanned': len(notes),
+            'notes_to_update': len(rewrites),
+            'attach_dir': str(attach_dir),
+            'moves': [{'original': str(src), 'target': str(dst)} for src, dst in moves.items()],
+            'collisions_resolved': collisions,
+            'skipped_in_place': skipped,
+            'missing': missing
+        }
+        
+        if dry_run or not moves:
+            return dict({'success': True, 'dry_run': dry_run}, **plan,
+                        updated_links={str(note): links for note, _, _, links in rewrites})
+        
+        # 3. 한 번에 실행
+        self.journal.recover()
+        ops = []
+        if not attach_dir.exists():
+            ops.append({'op': 'mkdir', 'path': str(attach_dir)})
+        ops += [{'op': 'move', 'src': str(src), 'dst': str(dst)} for src, dst in moves.items()]
+        ops += [{'op': 'write', 'path': str(note.resolve()), 'content': updated, 'before': content}
+                for note, content, updated, _ in rewrites if updated != content]
+        
+        outcome = self.journal.apply(ops)
+        if outcome['failed']:
+            return dict({'success': False, 'rolled_back': outcome['rolled_back'], 'failed': outcome['failed']}, **plan)
+        
+        self.logger.info(f"Moved {len(moves)} attachments for {len(rewrites)} notes into {attach_dir}")
+        return dict({'success': True, 'executed': len(ops)}, **plan)
+    
+    def _resolve_note_targets(self, target: str) -> Optional[List[Path]]:
+        """폴더(하위 전체) 또는 glob 패턴을 노트 목록으로 변환 (docs_root 기준 상대 경로 허용)"""
+        if any(char in target for char in '*?['):
+            base = Path(target)
+            if base.is_absolute():
+                anchor = Path(base.anchor)
+                notes = sorted(anchor.glob(str(base.relative_to(anchor))))
+            else:
+                notes = sorted(self.docs_root.glob(target))
+            return [note for note in notes if note.suffix == '.md' and note.is_file()]
+        
+        folder = Path(target)
+        if not folder.is_absolute() and not folder.exists():
+            folder = self.docs_root / target
+        if not folder.is_dir():
+            return None
+        return sorted(Path(entry.path) for entry in self._walk_notes(folder))
+    
+    def _resolve_attachment(self, note: Path, ref: str) -> Optional[Path]:
+        """첨부파일 참조를 실제 파일로 - 노트 폴더, docs_root, 현재 디렉토리 순"""
+        for base in (note.resolve().parent, self.docs_root, Path.cwd()):
+            candidate = base / ref
+            if candidate.is_file():
+                return candidate.resolve()
+        return None
+    
+    def _iter_attachment_refs(self, content: str) -> Iterator[str]:
+        """컨텐츠의 이미지 참조 경로 (Markdown, Obsidian 임베드, HTML 순)"""
+        for pattern, group in ATTACHMENT_PATTERNS:
+            for match in pattern.finditer(content):
+                file_path = match.group(group)
+                if file_path.lower().endswith(IMAGE_EXTENSIONS):
+                    yield file_path
+    
+    def _rewrite_attachment_links(self, content: str, links: Dict[str, str]) -> str:
+        """
+        이미지 참조 경로만 정확히 교체 (부분 문자열 오치환 방지)
+        Obsidian 임베드는 표준 Markdown 이미지 링크로 변환
+        """
+        for index, (pattern, group) in enumerate(ATTACHMENT_PATTERNS):
+            is_embed = index == 1
+            
+            def replace(match: re.Match) -> str:
+                ref = match.group(group)
+                if ref not in links:
+                    return match.group(0)
+                if is_embed:
+                    return f"![]({links[ref]})"
+                start, end = match.span(group)
+                offset = match.start()
+                text = match.group(0)
+                return text[:start - offset] + links[ref] + text[end - offset:]
+            content = pattern.sub(replace, content)
+        return content
+    
     def process_attachments(self, content: str, source_file: str = None) -> Dict[str, Any]:
         """
         컨텐츠에서 첨부파일 링크를 찾아 처리
@@ -715,46 +2546,24 @@ class ZettelkastenHelper:
             today = datetime.now().strftime(date_format)
             attach_dir = self.docs_root / base_path / today
             
-            # 이미지 링크 패턴 찾기
-            # Markdown 이미지: ![alt](path)
-            # Obsidian 임베드: ![[filename]]
-            # HTML 이미지: <img src="path">
-            patterns = [
-                r'!\[([^\]]*)\]\(([^)]+)\)',  # Markdown
-                r'!\[\[([^\]]+)\]\]',  # Obsidian embed
-                r'<img[^>]+src=["\']([^"\'\']+)["\']'  # HTML
-            ]
-            
             attachments_found = []
             suggestions = []
             
-            for pattern in patterns:
-                matches = re.findall(pattern, content)
-                for match in matches:
-                    if isinstance(match, tuple):
-                        # Markdown 패턴의 경우 (alt_text, path)
-                        if len(match) == 2:
-                            file_path = match[1]
-                        else:
-                            file_path = match[0]
-                    else:
-                        file_path = match
+            # 이미지 링크 찾기 (Markdown, Obsidian 임베드, HTML)
+            for file_path in self._iter_attachment_refs(content):
+                attachments_found.append(file_path)
+                
+                # 절대 경로나 URL이 아닌 경우에만 처리
+                if not file_path.startswith(('http://', 'https://', '/')):
+                    # 새 경로 제안
+                    filename = Path(file_path).name
+                    new_path = f"../../{base_path}/{today}/{filename}"
                     
-                    # 이미지 파일 확장자 체크
-                    if any(file_path.lower().endswith(ext) for ext in ['.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp']):
-                        attachments_found.append(file_path)
-                        
-                        # 절대 경로나 URL이 아닌 경우에만 처리
-                        if not file_path.startswith(('http://', 'https://', '/')):
-                            # 새 경로 제안
-                            filename = Path(file_path).name
-                            new_path = f"../../{base_path}/{today}/{filename}"
-                            
-                            suggestions.append({
-                                'original': file_path,
-                                'suggested': new_path,
-                                'full_path': str(attach_dir / filename)
-                            })
+                    suggestions.append({
+                        'original': file_path,
+                        'suggested': new_path,
+                        'full_path': str(attach_dir / filename)
+                    })
             
             # 디렉토리 생성 제안
             result = {
@@ -778,8 +2587,11 @@ class ZettelkastenHelper:
             self.logger.error(f"Error processing attachments: {e}")
             return {'error': str(e)}
     
-    def get_file_preview(self, filepath: str, lines: int = 5) -> Dict[str, Any]:
-        """파일 미리보기"""
+    def get_file_preview(self, filepath: str, lines: int = 5, links: bool = True) -> Dict[str, Any]:
+        """
+        파일 미리보기 - mmap으로 frontmatter와 본문 앞 N줄까지만 읽음
+        links=True면 링크 목록/전체 줄 수도 반환 (mtime/size 기준 캐시)
+        """
         path = Path(filepath)
         
         if not path.exists():
@@ -788,50 +2600,288 @@ class ZettelkastenHelper:
             }
         
         try:
-            content = path.read_text(encoding='utf-8')
+            stat = path.stat()
+            with open(path, 'rb') as f:
+                if stat.st_size == 0:
+                    return self._preview_from_buffer(path, stat, b'', lines, links)
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    return self._preview_from_buffer(path, stat, buffer, lines, links)
         except Exception as e:
             return {
                 'error': f'Cannot read file: {e}'
             }
+    
+    def get_file_previews(self, filepaths: List[str], lines: int = 5, links: bool = True) -> Dict[str, Any]:
+        """여러 파일 미리보기 - I/O 스레드 풀로 동시에 처리, 입력 순서 유지"""
+        previews = list(self.map_io(lambda filepath: dict({'path': filepath},
+                                                          **self.get_file_preview(filepath, lines, links)),
+                                    filepaths))
+        self.state.flush()
+        return {
+            'previews': previews,
+            'count': len(previews)
+        }
+    
+    def _preview_from_buffer(self, path: Path, stat: os.stat_result, buffer: Any,
+                             lines: int, links: bool) -> Dict[str, Any]:
+        """bytes/mmap 버퍼에서 미리보기 구성 - frontmatter와 본문 앞부분만 줄 단위로 디코딩"""
+        # Frontmatter 범위 찾기 (^---\n(.*?)\n---\n 와 동일 - 닫는 줄은 세 번째 줄부터)
+        frontmatter = {}
+        body_start = 0
+        rows = self._iter_buffer_lines(buffer)
+        first = next(rows, None)
+        if first and first[0] == '---' and first[2]:
+            frontmatter_lines = []
+            for line, next_start, terminated in rows:
+                if line == '---' and frontmatter_lines and terminated:
+                    try:
+                        frontmatter = yaml.safe_load('\n'.join(frontmatter_lines))
+                        for key, value in frontmatter.items():
+                            if hasattr(value, 'strftime'):
+                                frontmatter[key] = value.strftime('%Y-%m-%d')
+                    except Exception as e:
+                        return {
+                            'error': f'Invalid YAML frontmatter: {e}'
+                        }
+                    body_start = next_start
+                    break
+                frontmatter_lines.append(line)
         
-        match = re.match(r'^---\n(.*?)\n---\n(.*)', content, re.DOTALL)
-        if match:
-            try:
-                frontmatter = yaml.safe_load(match.group(1))
-                for key, value in frontmatter.items():
-                    if hasattr(value, 'strftime'):
-                        frontmatter[key] = value.strftime('%Y-%m-%d')
-                body = match.group(2)
-            except Exception as e:
-                return {
-                    'error': f'Invalid YAML frontmatter: {e}'
-                }
-        else:
-            frontmatter = {}
-            body = content
-        
-        body_lines = body.strip().split('\n')
-        preview_lines = body_lines[:lines]
+        # body.strip().split('\n')[:lines]와 같게 - 앞쪽 공백 줄은 건너뛰고 N번째 줄에서 멈춤
+        preview_lines = []
+        rows = self._iter_buffer_lines(buffer, body_start)
+        if lines > 0:
+            for line, _, _ in rows:
+                if not preview_lines:
+                    line = line.lstrip()
+                    if not line:
+                        continue
+                preview_lines.append(line)
+                if len(preview_lines) >= lines:
+                    break
         preview = '\n'.join(preview_lines)
+        # 뒤에 공백만 남았으면 strip()과 같이 끝 공백 제거 (공백이 아닌 줄을 만나면 바로 멈춤)
+        if all(not line.strip() for line, _, _ in rows):
+            preview = preview.rstrip()
         
-        links = re.findall(r'\[\[([^\]]+)\]\]', content)
-        
-        return {
+        result = {
             'filename': path.name,
             'frontmatter': frontmatter,
             'preview': preview,
-            'tags': frontmatter.get('tags', []),
+            'tags': frontmatter.get('tags', [])
+        }
+        
+        if links:
+            result.update(self._preview_link_info(path, stat, buffer, body_start))
+        
+        return result
+    
+    def _iter_buffer_lines(self, buffer: Any, start: int = 0) -> Iterator[Tuple[str, int, bool]]:
+        """
+        버퍼를 start부터 한 줄씩 디코딩 - read_text와 같이 \r\n, \r도 줄바꿈으로 처리
+        (줄, 다음 줄 시작 offset, 줄바꿈으로 끝났는지)
+        """
+        size = len(buffer)
+        while start < size:
+            newline = buffer.find(b'\n', start)
+            line_end = size if newline == -1 else newline
+            carriage = buffer.find(b'\r', start, line_end)
+            if carriage != -1:
+                line_end = carriage
+                next_start = carriage + 2 if buffer[carriage + 1:carriage + 2] == b'\n' else carriage + 1
+            else:
+                next_start = newline + 1 if newline != -1 else size
+            yield buffer[start:line_end].decode('utf-8'), next_start, line_end < size
+            start = next_start
+    
+    def _preview_link_info(self, path: Path, stat: os.stat_result, buffer: Any, body_start: int) -> Dict[str, Any]:
+        """링크 목록과 본문 전체 줄 수 - 파일 전체가 필요하므로 파일이 바뀌지 않았으면 캐시 사용"""
+        key = str(path.resolve())
+        cached = self.state.get('preview_links', key)
+        if cached and cached['mtime_ns'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+            return {'links': cached['links'], 'total_lines': cached['total_lines']}
+        
+        content = self._decode_text(buffer[:])
+        body = content[len(self._decode_text(buffer[:body_start])):]
+        links = re.findall(r'\[\[([^\]]+)\]\]', content)
+        total_lines = len(body.strip().split('\n'))
+        
+        self.state.put('preview_links', key, {
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
             'links': links,
-            'total_lines': len(body_lines)
+            'total_lines': total_lines
+        })
+        return {'links': links, 'total_lines': total_lines}
+
+
+class VaultFederation:
+    """
+    여러 vault(rules.yaml의 vaults)에 같은 질의를 병렬로 실행하고 결과를 병합
+    - vault마다 별도의 ZettelkastenHelper (각자의 docs_root와 캐시)
+    - 각 결과에 'vault' 태그를 붙이고 정렬 키 기준으로 병합 후 페이지 단위로 반환
+    """
+
+    def __init__(self, helper: 'ZettelkastenHelper'):
+        self.logger = helper.logger
+        vaults = helper.config.get('vaults') or {}
+        self.helpers = {
+            name: ZettelkastenHelper(helper.config_path, vault=name)
+            for name in vaults
         }
 
+    def query(self, collect: Callable[['ZettelkastenHelper'], List[Dict[str, Any]]],
+              sort_key: Callable[[Dict[str, Any]], Any], reverse: bool = False,
+              offset: int = 0, limit: Optional[int] = None,
+              summarize: Optional[Callable[[Iterable[Dict[str, Any]]], Any]] = None) -> Dict[str, Any]:
+        """
+        collect(helper)를 vault별로 병렬 실행 → vault 내 정렬 → 전체 병합 → offset/limit
+        summarize: 페이지가 아닌 전체 결과로 계산할 요약 (result['summary'])
+        """
+        if not self.helpers:
+            return {'error': 'No vaults configured (add "vaults" to rules.yaml)'}
+        
+        def run(name: str) -> List[Dict[str, Any]]:
+            records = [dict(record, vault=name) for record in collect(self.helpers[name])]
+            records.sort(key=sort_key, reverse=reverse)
+            return records
+        
+        per_vault = {}
+        errors = {}
+        with ThreadPoolExecutor(max_workers=len(self.helpers), thread_name_prefix='zk-vault') as pool:
+            futures = {name: pool.submit(run, name) for name in self.helpers}
+            for name, future in futures.items():
+                try:
+                    per_vault[name] = future.result()
+                except Exception as e:
+                    self.logger.error(f"Vault '{name}' failed: {e}")
+                    errors[name] = str(e)
+        
+        # vault별로 이미 정렬된 목록을 병합하며 필요한 페이지만 꺼냄
+        merged = heapq.merge(*per_vault.values(), key=sort_key, reverse=reverse)
+        stop = offset + limit if limit is not None else None
+        page = list(itertools.islice(merged, offset, stop))
+        
+        result = {
+            'results': page,
+            'count': len(page),
+            'total': sum(len(records) for records in per_vault.values()),
+            'offset': offset,
+            'limit': limit,
+            'vaults': {name: len(records) for name, records in per_vault.items()}
+        }
+        if summarize:
+            result['summary'] = summarize(itertools.chain.from_iterable(per_vault.values()))
+        if errors:
+            result['errors'] = errors
+        return result
+
+    def list_mocs(self, offset: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+        return self.query(lambda helper: list(helper.iter_mocs()),
+                          lambda record: (record['filename'], record['vault']), offset=offset, limit=limit)
+
+    def list_concepts(self, filters: Optional[Dict] = None, offset: int = 0,
+                      limit: Optional[int] = None) -> Dict[str, Any]:
+        return self.query(lambda helper: list(helper.iter_concepts(filters)),
+                          lambda record: (record['filename'], record['vault']), offset=offset, limit=limit)
+
+    def search(self, query: str, filters: Optional[Dict] = None, content: bool = False,
+               offset: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+        # 수정일 내림차순 (같으면 vault, 경로 역순)
+        result = self.query(lambda helper: helper.search(query, filters, content)['results'],
+                            lambda record: (record['mtime'] or '', record['vault'], record['path']),
+                            reverse=True, offset=offset, limit=limit)
+        return dict({'query': query}, **result)
+
+    def validate_many(self, targets: List[str], mode: str = 'deep', use_cache: bool = True,
+                      offset: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        targets는 각 vault의 docs_root 기준 상대 경로
+        없으면 vault 전체 - 폴더는 validate_many가 _walk_notes로 펼치므로 숨김 폴더와 90-설정은 제외
+        """
+        def collect(helper: 'ZettelkastenHelper') -> List[Dict[str, Any]]:
+            paths = [str(helper.docs_root / target) for target in targets] or [str(helper.docs_root)]
+            return helper.validate_many(paths, mode, use_cache)['results']
+        
+        def summarize(records: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+            summary = {}
+            for record in records:
+                summary[record['status']] = summary.get(record['status'], 0) + 1
+            return summary
+        
+        return self.query(collect, lambda record: (record['vault'], record['path']),
+                          offset=offset, limit=limit, summarize=summarize)
+
+def _prom_escape(value: str) -> str:
+    """Prometheus label 값 이스케이프"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def parse_limit(argv: List[str]) -> Optional[int]:
+    """--limit N 옵션 파싱"""
+    return parse_int_option(argv, '--limit')
+
+
+def parse_int_option(argv: List[str], option: str) -> Optional[int]:
+    """--option N 형식의 정수 옵션 파싱"""
+    if option in argv:
+        index = argv.index(option)
+        if index + 1 < len(argv) and argv[index + 1].isdigit():
+            return int(argv[index + 1])
+    return None
+
+
+def pop_option(argv: List[str], option: str) -> Optional[str]:
+    """
+    --option VALUE를 argv에서 제거하고 값 반환 (위치 인자 파싱과 겹치지 않도록)
+    옵션이 없으면 None, 값이 빠져 있으면 ValueError
+    """
+    if option not in argv:
+        return None
+    index = argv.index(option)
+    value = argv[index + 1] if index + 1 < len(argv) else None
+    if value is None or value.startswith('--'):
+        raise ValueError(f'Missing value for {option}')
+    del argv[index:index + 2]
+    return value
+
+
+def emit_jsonl(records: Iterator[Dict[str, Any]], limit: Optional[int] = None):
+    """레코드를 JSONL로 한 줄씩 즉시 출력 - limit 도달 시 스캔 중단"""
+    try:
+        # --limit 0이면 스캔 없이 종료 (federation 경로와 동일하게 결과 없음)
+        if limit is not None and limit <= 0:
+            return
+        for count, record in enumerate(records, 1):
+            print(json.dumps(record, ensure_ascii=False), flush=True)
+            if limit is not None and count >= limit:
+                break
+    except BrokenPipeError:
+        # head 등 소비자가 먼저 종료한 경우
+        sys.stderr.close()
+    finally:
+        close = getattr(records, 'close', None)
+        if close:
+            close()
+
 
 def main():
     """CLI 인터페이스"""
+    # 전역 옵션: --vault NAME (단일 vault 선택), --all-vaults (모든 vault에 병렬 실행)
+    # 명령 앞에 와도 되도록 명령 이름을 읽기 전에 제거
+    try:
+        vault = pop_option(sys.argv, '--vault')
+    except ValueError as e:
+        print(json.dumps({'error': str(e)}))
+        sys.exit(1)
+    all_vaults = '--all-vaults' in sys.argv
+    if all_vaults:
+        sys.argv.remove('--all-vaults')
+    
     if len(sys.argv) < 2:
         print(json.dumps({
             'error': 'Usage: orchestrator.py <command> [args]',
-            'commands': ['scenario_info', 'filename', 'specs', 'validate', 'list_mocs', 'list_concepts', 'preview', 'attachments', 'load_specs', 'workflow', 'process_attachments']
+            'commands': COMMANDS
         }))
         sys.exit(1)
     
@@ -844,7 +2894,37 @@ def main():
         }))
         sys.exit(1)
     
-    helper = ZettelkastenHelper(str(config_path))
+    if all_vaults:
+        if command not in FEDERATED_COMMANDS:
+            print(json.dumps({'error': f'--all-vaults is not supported for {command}',
+                              'supported': FEDERATED_COMMANDS}))
+            sys.exit(1)
+    
+    try:
+        helper = ZettelkastenHelper(str(config_path), vault=vault)
+    except ValueError as e:
+        print(json.dumps({'error': str(e)}, ensure_ascii=False))
+        sys.exit(1)
+    
+    # 명령별 지연시간/성공 여부 기록 (metrics 명령으로 export)
+    start = time.perf_counter()
+    status = 'ok'
+    try:
+        run_command(helper, command, VaultFederation(helper) if all_vaults else None)
+    except SystemExit as e:
+        status = 'error' if e.code else 'ok'
+        raise
+    except Exception:
+        status = 'error'
+        raise
+    finally:
+        if command in COMMANDS:
+            helper.record_command(command, time.perf_counter() - start, status)
+
+
+def run_command(helper: ZettelkastenHelper, command: str, federation: Optional[VaultFederation] = None):
+    """명령 실행 - federation이 있으면 지원하는 명령을 모든 vault에 병렬 실행"""
+    offset = parse_int_option(sys.argv, '--offset') or 0
     
     if command == 'scenario_info':
         if len(sys.argv) < 3:
@@ -857,12 +2937,27 @@ def main():
     
     elif command == 'filename':
         if len(sys.argv) < 4:
-            print(json.dumps({'error': 'Usage: orchestrator.py filename <scenario> <title>'}))
+            print(json.dumps({'error': 'Usage: orchestrator.py filename <scenario> <title> [--reserve]'}))
             sys.exit(1)
         
         scenario = sys.argv[2]
         title = sys.argv[3]
-        result = helper.get_filename(scenario, title)
+        result = helper.get_filename(scenario, title, reserve='--reserve' in sys.argv)
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    
+    elif command == 'filenames':
+        if len(sys.argv) < 3:
+            print(json.dumps({'error': 'Usage: orchestrator.py filenames \'[["create", "title", {}], ...]\' (or - for stdin) [--reserve]'}))
+            sys.exit(1)
+        
+        try:
+            raw = sys.stdin.read() if sys.argv[2] == '-' else sys.argv[2]
+            items = json.loads(raw)
+        except json.JSONDecodeError as e:
+            print(json.dumps({'error': f'Invalid JSON: {e}'}))
+            sys.exit(1)
+        
+        result = helper.get_filenames(items, reserve='--reserve' in sys.argv)
         print(json.dumps(result, ensure_ascii=False, indent=2))
     
     elif command == 'specs':
@@ -876,37 +2971,138 @@ def main():
     
     elif command == 'validate':
         if len(sys.argv) < 3:
-            print(json.dumps({'error': 'Usage: orchestrator.py validate <filepath> [mode]'}))
+            print(json.dumps({'error': 'Usage: orchestrator.py validate <filepath> [mode] [--no-cache]'}))
             sys.exit(1)
         
         filepath = sys.argv[2]
-        mode = sys.argv[3] if len(sys.argv) > 3 else 'deep'
-        result = helper.validate(filepath, mode)
+        args = [arg for arg in sys.argv[3:] if not arg.startswith('--')]
+        mode = args[0] if args else 'deep'
+        use_cache = '--no-cache' not in sys.argv
+        result = helper.validate(filepath, mode, use_cache)
         print(json.dumps(result, ensure_ascii=False, indent=2))
     
-    elif command == 'list_mocs':
-        result = helper.list_mocs()
+    elif command == 'validate_many':
+        if len(sys.argv) < 3:
+            print(json.dumps({'error': 'Usage: orchestrator.py validate_many <filepath|dir>... [--mode quick] [--no-cache] [--all-vaults]'}))
+            sys.exit(1)
+        
+        mode = 'deep'
+        filepaths = []
+        args = iter(sys.argv[2:])
+        for arg in args:
+            if arg == '--mode':
+                mode = next(args, mode)
+            elif arg in ('--offset', '--limit'):
+                next(args, None)
+            elif not arg.startswith('--'):
+                filepaths.append(arg)
+        
+        if federation:
+            # 경로는 각 vault의 docs_root 기준
+            result = federation.validate_many(filepaths, mode, '--no-cache' not in sys.argv,
+                                              offset, parse_limit(sys.argv))
+        else:
+            result = helper.validate_many(filepaths, mode, '--no-cache' not in sys.argv)
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    
+    elif command == 'search':
+        if len(sys.argv) < 3:
+            print(json.dumps({'error': 'Usage: orchestrator.py search <query> [filters] [--content] [--offset N] [--limit N]'}))
+            sys.exit(1)
+        
+        query = sys.argv[2]
+        filters = {}
+        if len(sys.argv) > 3 and not sys.argv[3].startswith('--'):
+            try:
+                filters = json.loads(sys.argv[3])
+            except json.JSONDecodeError:
+                pass
+        content = '--content' in sys.argv
+        
+        if federation:
+            result = federation.search(query, filters, content, offset, parse_limit(sys.argv))
+        else:
+            result = helper.search(query, filters, content)
         print(json.dumps(result, ensure_ascii=False, indent=2))
     
+    elif command == 'list_mocs':
+        if federation:
+            result = federation.list_mocs(offset, parse_limit(sys.argv))
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+        elif '--stream' in sys.argv:
+            emit_jsonl(helper.iter_mocs(), parse_limit(sys.argv))
+        else:
+            result = helper.list_mocs()
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+    
     elif command == 'list_concepts':
         filters = {}
-        if len(sys.argv) > 2:
+        if len(sys.argv) > 2 and not sys.argv[2].startswith('--'):
             try:
                 filters = json.loads(sys.argv[2])
             except json.JSONDecodeError:
                 pass
         
-        result = helper.list_concepts(filters)
+        if federation:
+            result = federation.list_concepts(filters, offset, parse_limit(sys.argv))
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+        elif '--stream' in sys.argv:
+            emit_jsonl(helper.iter_concepts(filters), parse_limit(sys.argv))
+        else:
+            result = helper.list_concepts(filters)
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+    
+    elif command == 'dates':
+        query = {}
+        if len(sys.argv) > 2 and not sys.argv[2].startswith('--'):
+            try:
+                query = json.loads(sys.argv[2])
+            except json.JSONDecodeError:
+                print(json.dumps({'error': 'Usage: orchestrator.py dates \'{"field": "created", "after_date": "YYYY-MM-DD"}\' [--refresh]'}))
+                sys.exit(1)
+        
+        result = helper.query_dates(query, True if '--refresh' in sys.argv else None)
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    
+    elif command == 'archive_candidates':
+        args = [arg for arg in sys.argv[2:] if not arg.startswith('--')]
+        days = int(args[0]) if args else 365
+        result = helper.archive_candidates(days, True if '--refresh' in sys.argv else None)
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    
+    elif command == 'triage':
+        result = helper.triage(parse_limit(sys.argv), True if '--refresh' in sys.argv else None)
         print(json.dumps(result, ensure_ascii=False, indent=2))
     
     elif command == 'preview':
         if len(sys.argv) < 3:
-            print(json.dumps({'error': 'Usage: orchestrator.py preview <filepath> [lines]'}))
+            print(json.dumps({'error': 'Usage: orchestrator.py preview <filepath> [lines] [--no-links]'}))
             sys.exit(1)
         
         filepath = sys.argv[2]
-        lines = int(sys.argv[3]) if len(sys.argv) > 3 else 5
-        result = helper.get_file_preview(filepath, lines)
+        args = [arg for arg in sys.argv[3:] if not arg.startswith('--')]
+        lines = int(args[0]) if args else 5
+        result = helper.get_file_preview(filepath, lines, '--no-links' not in sys.argv)
+        helper.state.flush()
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    
+    elif command == 'preview_batch':
+        if len(sys.argv) < 3:
+            print(json.dumps({'error': 'Usage: orchestrator.py preview_batch <filepath>... [--lines N] [--no-links] (or - for stdin)'}))
+            sys.exit(1)
+        
+        lines = parse_int_option(sys.argv, '--lines') or 5
+        args = iter(sys.argv[2:])
+        filepaths = []
+        for arg in args:
+            if arg == '--lines':
+                next(args, None)
+            elif arg == '-':
+                filepaths.extend(line.strip() for line in sys.stdin if line.strip())
+            elif not arg.startswith('--'):
+                filepaths.append(arg)
+        
+        result = helper.get_file_previews(filepaths, lines, '--no-links' not in sys.argv)
         print(json.dumps(result, ensure_ascii=False, indent=2))
     
     elif command == 'attachments':
@@ -966,6 +3162,49 @@ def main():
         result = helper.execute_attachments(filepath, dry_run)
         print(json.dumps(result, ensure_ascii=False, indent=2))
     
+    elif command == 'process_attachments_batch':
+        if len(sys.argv) < 3:
+            print(json.dumps({'error': 'Usage: orchestrator.py process_attachments_batch <folder|glob> [--dry-run]'}))
+            sys.exit(1)
+        
+        target = sys.argv[2]
+        dry_run = '--dry-run' in sys.argv or '--dry' in sys.argv
+        
+        result = helper.execute_attachments_batch(target, dry_run)
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    
+    elif command == 'metrics':
+        # Prometheus text format - node-exporter textfile collector용
+        try:
+            output = pop_option(sys.argv, '--output')
+        except ValueError as e:
+            print(json.dumps({'error': str(e)}))
+            sys.exit(1)
+        
+        text = helper.export_metrics(True if '--refresh' in sys.argv else None)
+        if output:
+            # collector가 쓰다 만 파일을 읽지 않도록 임시 파일 + rename
+            tmp_path = f"{output}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, output)
+        else:
+            sys.stdout.write(text)
+    
+    elif command == 'export':
+        try:
+            since = pop_option(sys.argv, '--since')
+        except ValueError as e:
+            print(json.dumps({'error': str(e)}))
+            sys.exit(1)
+        
+        if len(sys.argv) < 4:
+            print(json.dumps({'error': 'Usage: orchestrator.py export <msgpack|parquet|graphml> <out_dir> [--since SNAPSHOT_ID]'}))
+            sys.exit(1)
+        
+        result = helper.export_snapshot(sys.argv[2], sys.argv[3], since)
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    
     else:
         print(json.dumps({'error': f'Unknown command: {command}'}))
         sys.exit(1)